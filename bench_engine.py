@@ -0,0 +1,70 @@
+"""
+In-process throughput benchmark for the game engine.
+
+Drives CasinoService directly, without any Telegram objects: each simulated user keeps
+placing bets and playing random legal moves until the requested number of actions
+(bets plus moves) has been made.
+
+Usage: python bench_engine.py [--actions N] [--users N] [--seed N]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from engine import BLACKJACK_ACTIONS, CasinoService
+from guard import BetGuard
+
+ROULETTE_BET_TYPES = ('red', 'black', 'odd', 'even', '1st12', 'col2', '17')
+
+
+async def drive(casino: CasinoService, user_ids: list, total_actions: int, rng: random.Random) -> int:
+    """Plays random rounds until total_actions have been made. Returns the number of rounds settled."""
+    rounds = 0
+    for actions in range(total_actions):
+        user_id = user_ids[actions % len(user_ids)]
+        blackjack_game = casino.blackjack_games.get(user_id)
+        poker_game = casino.poker_games.get(user_id)
+        if blackjack_game is not None:
+            options = casino.blackjack_options(user_id, blackjack_game)
+            moves = [action for action in BLACKJACK_ACTIONS if options.get(action, True)]
+            result = await casino.act(user_id, 'blackjack', rng.choice(moves))
+        elif poker_game is not None:
+            if rng.random() < 0.6:
+                result = await casino.act(user_id, 'poker', 'hold', index=rng.randrange(5))
+            else:
+                result = await casino.act(user_id, 'poker', 'draw')
+        else:
+            game = rng.choice(('roulette', 'blackjack', 'poker'))
+            result = await casino.place_bet(user_id, game, 10, bet_type=rng.choice(ROULETTE_BET_TYPES),
+                                            num_hands=rng.choice((1, 1, 3, 10)))
+        if result.error:
+            raise RuntimeError(f"Unexpected refusal for user {user_id}: {result.error}")
+        rounds += result.finished
+    return rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--actions', type=int, default=200_000, help='Bets plus moves to make')
+    parser.add_argument('--users', type=int, default=1000, help='Simulated users, played round-robin')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    # No rate or loss limit, and enough money that nobody goes broke mid-run
+    casino = CasinoService(guard=BetGuard(bets_per_minute=10 ** 12, daily_loss_limit=0))
+    user_ids = list(range(args.users))
+    for user_id in user_ids:
+        casino.open_account(user_id)
+        casino.balances[user_id] = 10 ** 9
+    random.seed(args.seed)  # The games deal from the module-level RNG
+
+    start = time.perf_counter()
+    rounds = asyncio.run(drive(casino, user_ids, args.actions, random.Random(args.seed)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.actions} actions ({rounds} rounds settled) in {elapsed:.2f}s: {args.actions / elapsed:,.0f} actions/s")
+
+
+if __name__ == '__main__':
+    main()
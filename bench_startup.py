@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark for the bot's modules.
+
+Imports each module in a fresh interpreter with `python -X importtime`, keeps the best
+cumulative time over several runs and compares it with the module's budget. It also
+checks that the game engines load without python-telegram-bot.
+
+Usage: python bench_startup.py [--runs N]
+Exits with status 1 when a module is over budget or an engine imports telegram.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Cumulative import time budget per module, in milliseconds
+BUDGETS_MS = {
+    'blackjack': 30,
+    'poker': 30,
+    'roulette': 15,
+    'guard': 30,
+    'stats': 30,
+    'snapshots': 40,
+    'game_config': 40,
+    'engine': 50,
+    'scheduler': 40,
+    'diagnostics': 30,
+    'main': 5,     # Entry point: must not import anything heavy before main() runs
+    'bot': 250,    # Full Telegram stack, the real cold-start cost of a restart
+}
+# Modules that must be importable without the Telegram stack
+TELEGRAM_FREE = ('blackjack', 'poker', 'roulette', 'guard', 'stats', 'snapshots', 'game_config', 'engine', 'scheduler', 'diagnostics', 'main')
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+TELEGRAM_MISSING = "ModuleNotFoundError: No module named 'telegram'"
+
+
+class ImportFailed(Exception):
+    """A module could not be imported; the message is the last line of its traceback."""
+
+
+def measure(module: str):
+    """Returns (cumulative microseconds, imported module names) for one cold import. Raises ImportFailed."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_DIR, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if line.strip() and not line.startswith('import time:')]
+        raise ImportFailed(errors[-1] if errors else f"exit status {result.returncode}")
+    cumulative, imported = None, []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace('import time:', '|', 1).split('|'))
+        if not cumulative_us.isdigit():
+            continue  # Header line
+        imported.append(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    if cumulative is None:
+        raise ImportFailed("no import time reported")
+    return cumulative, imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Imports per module; the best run is reported')
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<12} {'best ms':>8} {'budget':>8}  status")
+    for module, budget_ms in BUDGETS_MS.items():
+        try:
+            runs = [measure(module) for _ in range(args.runs)]
+        except ImportFailed as e:
+            # Only the Telegram-facing modules may be skipped, and only when the library isn't installed
+            if module not in TELEGRAM_FREE and str(e).startswith(TELEGRAM_MISSING):
+                print(f"{module:<12} {'-':>8} {budget_ms:>8}  skipped (python-telegram-bot not installed)")
+                continue
+            failed = True
+            print(f"{module:<12} {'-':>8} {budget_ms:>8}  IMPORT FAILED: {e}")
+            continue
+
+        best_ms = min(run[0] for run in runs) / 1000
+        status = 'ok' if best_ms <= budget_ms else 'OVER BUDGET'
+        if module in TELEGRAM_FREE and any(name.startswith('telegram') for name in runs[0][1]):
+            status = 'IMPORTS TELEGRAM'
+        failed = failed or status != 'ok'
+        print(f"{module:<12} {best_ms:>8.1f} {budget_ms:>8}  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
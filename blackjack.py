@@ -1,5 +1,6 @@
 import random
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
 
 # --- Constants ---
 SUITS = ['♠️', '♥️', '♦️', '♣️']
@@ -8,6 +9,12 @@ VALUES = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10':
 
 Card = Tuple[str, str]  # (Rank, Suit)
 
+MAX_HANDS = 4  # Most hands a player can have after re-splitting
+BLACKJACK_PAYOUT = 1.5  # Default payout of a natural blackjack (3:2)
+
+# Dealer final totals, in the order used by dealer_outcome_probabilities
+DEALER_OUTCOMES = ('17', '18', '19', '20', '21', 'bust')
+
 # --- Deck Class ---
 class Deck:
     """Represents a deck of playing cards."""
@@ -53,16 +60,113 @@ class Hand:
         """String representation of the hand."""
         return ' '.join([f"{card[0]}{card[1]}" for card in self.cards])
 
+# --- Dealer Outcome Tables ---
+Shoe = Tuple[int, ...]  # Number of cards left per value, index 0 is a 2 and index 9 is an Ace
+FULL_SHOE: Shoe = (4, 4, 4, 4, 4, 4, 4, 4, 16, 4)
+
+
+def shoe_composition(cards: Sequence[Card]) -> Shoe:
+    """Counts the given cards by blackjack value."""
+    counts = [0] * 10
+    for rank, _ in cards:
+        counts[VALUES[rank] - 2] += 1
+    return tuple(counts)
+
+
+@lru_cache(maxsize=1 << 16)
+def _dealer_draws(total: int, soft_aces: int, shoe: Shoe) -> Tuple[float, ...]:
+    """Distribution of the dealer's final total from a partial hand, drawing from the shoe."""
+    if total >= 17:  # The dealer stands on all 17s, like BlackjackGame.dealer_plays
+        outcome = [0.0] * 6
+        outcome[5 if total > 21 else total - 17] = 1.0
+        return tuple(outcome)
+
+    remaining = sum(shoe)
+    if remaining == 0:  # Deck.deal starts a fresh deck when it runs out
+        shoe, remaining = FULL_SHOE, 52
+
+    outcome = [0.0] * 6
+    for index, count in enumerate(shoe):
+        if not count:
+            continue
+        value = index + 2
+        new_total, new_soft = total + value, soft_aces + (value == 11)
+        while new_total > 21 and new_soft:
+            new_total -= 10
+            new_soft -= 1
+        next_shoe = shoe[:index] + (count - 1,) + shoe[index + 1:]
+        probability = count / remaining
+        for i, p in enumerate(_dealer_draws(new_total, new_soft, next_shoe)):
+            outcome[i] += probability * p
+    return tuple(outcome)
+
+
+@lru_cache(maxsize=4096)
+def dealer_outcome_probabilities(upcard_value: int, shoe: Shoe) -> Tuple[float, ...]:
+    """
+    Probability of each DEALER_OUTCOMES total given the dealer's upcard value (2-11)
+    and the composition of the cards the dealer can still draw (including the hole card).
+    """
+    return _dealer_draws(upcard_value, 1 if upcard_value == 11 else 0, shoe)
+
+
+def dealer_cache_sizes() -> Dict[str, int]:
+    """Entries held by the dealer outcome caches, for memory reports."""
+    return {
+        'dealer_draws': _dealer_draws.cache_info().currsize,
+        'dealer_outcomes': dealer_outcome_probabilities.cache_info().currsize,
+    }
+
+
+def stand_expected_value(player_total: int, outcome: Sequence[float]) -> float:
+    """Expected result per unit bet of standing on player_total against a dealer outcome distribution."""
+    if player_total > 21:
+        return -1.0
+    expected = outcome[5]  # Dealer busts
+    for i, probability in enumerate(outcome[:5]):
+        dealer_total = 17 + i
+        if player_total > dealer_total:
+            expected += probability
+        elif player_total < dealer_total:
+            expected -= probability
+    return expected
+
 # --- Game State Class ---
 class BlackjackGame:
-    """Manages the state of a single blackjack game."""
-    def __init__(self, bet_amount: int):
+    """
+    Manages the state of a single blackjack game.
+    Supports split (up to MAX_HANDS), double down, insurance and early surrender.
+    There is no hole-card peek: a dealer blackjack beats every hand that is not a blackjack,
+    including doubled and split hands, and surrender is allowed before the dealer checks.
+    """
+    blackjack_payout = BLACKJACK_PAYOUT  # Also used by games rebuilt from a snapshot
+
+    def __init__(self, bet_amount: int, blackjack_payout: float = BLACKJACK_PAYOUT):
         self.deck = Deck()
-        self.player_hand = Hand()
+        self.blackjack_payout = blackjack_payout  # Fixed for the whole game, even if the config is reloaded
+        self.player_hands: List[Hand] = [Hand()]
+        self.hand_bets: List[int] = [bet_amount]
+        self.active_hand = 0  # Index of the hand being played; len(player_hands) once all are done
         self.dealer_hand = Hand()
         self.bet_amount = bet_amount
+        self.insurance_bet = 0
+        self.surrendered = False
         self.game_over = False
 
+    @property
+    def player_hand(self) -> Hand:
+        """The hand currently being played (the last one once the player is done)."""
+        return self.player_hands[min(self.active_hand, len(self.player_hands) - 1)]
+
+    @property
+    def is_player_done(self) -> bool:
+        """True once every hand has been stood, busted, doubled or surrendered."""
+        return self.surrendered or self.active_hand >= len(self.player_hands)
+
+    def total_wagered(self) -> int:
+        """Everything the player has at stake, including insurance."""
+        return sum(self.hand_bets) + self.insurance_bet
+
     def start_game(self):
         """Deals the initial two cards to player and dealer."""
         self.player_hand.add_card(self.deck.deal())
@@ -70,36 +174,108 @@ class BlackjackGame:
         self.player_hand.add_card(self.deck.deal())
         self.dealer_hand.add_card(self.deck.deal())
 
+    def _advance(self):
+        """Moves on to the next hand, dealing the second card to split hands."""
+        self.active_hand += 1
+        if self.active_hand < len(self.player_hands):
+            hand = self.player_hands[self.active_hand]
+            if len(hand.cards) == 1:
+                hand.add_card(self.deck.deal())
+                if hand.cards[0][0] == 'A':  # Split aces get one card each
+                    self._advance()
+
+    def _is_first_decision(self) -> bool:
+        return len(self.player_hands) == 1 and len(self.player_hands[0].cards) == 2 and not self.is_player_done
+
+    # --- Available actions ---
+    def can_double(self) -> bool:
+        return not self.is_player_done and len(self.player_hand.cards) == 2
+
+    def can_split(self) -> bool:
+        hand = self.player_hand
+        return (
+            not self.is_player_done
+            and len(self.player_hands) < MAX_HANDS
+            and len(hand.cards) == 2
+            and VALUES[hand.cards[0][0]] == VALUES[hand.cards[1][0]]
+        )
+
+    def can_insure(self) -> bool:
+        return self._is_first_decision() and self.insurance_bet == 0 and self.dealer_hand.cards[0][0] == 'A'
+
+    def can_surrender(self) -> bool:
+        return self._is_first_decision()
+
+    # --- Player actions ---
     def player_hits(self) -> bool:
-        """Player takes another card. Returns True if player busts."""
+        """Current hand takes another card. Returns True if that hand busts."""
         self.player_hand.add_card(self.deck.deal())
         if self.player_hand.value > 21:
-            self.game_over = True
+            self._advance()
             return True  # Busted
         return False  # Not busted
 
+    def player_stands(self):
+        """Stands on the current hand."""
+        self._advance()
+
+    def player_doubles(self):
+        """Doubles the current hand's bet, takes exactly one card and stands."""
+        self.hand_bets[self.active_hand] *= 2
+        self.player_hand.add_card(self.deck.deal())
+        self._advance()
+
+    def player_splits(self):
+        """Splits the current pair into two hands, each with the original bet."""
+        hand = self.player_hand
+        second = Hand()
+        second.add_card(hand.cards.pop())
+        first = Hand()
+        first.add_card(hand.cards[0])
+        first.add_card(self.deck.deal())
+        self.player_hands[self.active_hand] = first
+        self.player_hands.insert(self.active_hand + 1, second)
+        self.hand_bets.insert(self.active_hand + 1, self.hand_bets[self.active_hand])
+        if first.cards[0][0] == 'A':  # Split aces get one card each
+            self._advance()
+
+    def player_insures(self):
+        """Takes insurance for half the bet. Pays 2:1 if the dealer has blackjack."""
+        self.insurance_bet = self.bet_amount // 2
+
+    def surrender_loss(self) -> int:
+        """Half the bet, rounded up so that surrendering is never free."""
+        return (self.bet_amount + 1) // 2
+
+    def player_surrenders(self):
+        """Gives up the hand; the player loses surrender_loss(), half the bet rounded up."""
+        self.surrendered = True
+
+    # --- Dealer and settlement ---
     def dealer_plays(self):
         """Dealer plays their turn according to standard rules (hit on 16, stand on 17)."""
         while self.dealer_hand.value < 17:
             self.dealer_hand.add_card(self.deck.deal())
         self.game_over = True
 
-    def determine_winner(self) -> Tuple[str, float]:
-        """
-        Determines the winner and the payout multiplier.
-        Returns a tuple of (result_string, payout_multiplier).
-        -1: Player loses bet, 0: Push, 1: Player wins, 1.5: Player gets Blackjack
-        """
-        player_score = self.player_hand.value
+    def _is_blackjack(self, hand: Hand) -> bool:
+        # A 21 made on a split hand is not a blackjack
+        return hand.value == 21 and len(hand.cards) == 2 and len(self.player_hands) == 1
+
+    def _hand_result(self, hand: Hand) -> Tuple[str, float]:
+        """Result and payout multiplier of one player hand against the dealer."""
+        player_score = hand.value
         dealer_score = self.dealer_hand.value
 
-        is_player_blackjack = player_score == 21 and len(self.player_hand.cards) == 2
+        is_player_blackjack = self._is_blackjack(hand)
         is_dealer_blackjack = dealer_score == 21 and len(self.dealer_hand.cards) == 2
 
         if is_player_blackjack:
-            return ("blackjack", 1.5) if not is_dealer_blackjack else ("push", 0)
+            return ("blackjack", self.blackjack_payout) if not is_dealer_blackjack else ("push", 0)
         if player_score > 21:
             return "bust", -1
+        if is_dealer_blackjack:
+            return "loss", -1
         if dealer_score > 21:
             return "win", 1
         if player_score > dealer_score:
@@ -107,4 +283,45 @@ class BlackjackGame:
         elif player_score < dealer_score:
             return "loss", -1
         else:  # Scores are equal
-            return "push", 0
\ No newline at end of file
+            return "push", 0
+
+    def determine_winner(self) -> Tuple[str, float]:
+        """
+        Determines the winner of the first hand and the payout multiplier.
+        Returns a tuple of (result_string, payout_multiplier).
+        -1: Player loses bet, 0: Push, 1: Player wins, blackjack_payout (1.5 by default): Player gets Blackjack
+        """
+        return self._hand_result(self.player_hands[0])
+
+    def settle(self) -> Tuple[List[Tuple[str, int]], int]:
+        """
+        Finishes the round. The dealer only draws if a hand is still live.
+        Returns ([(result, payout) per hand], insurance_payout).
+        """
+        dealer_blackjack = self.dealer_hand.value == 21 and len(self.dealer_hand.cards) == 2
+        insurance_payout = self.insurance_bet * 2 if dealer_blackjack else -self.insurance_bet
+
+        if self.surrendered:
+            self.game_over = True
+            return [("surrender", -self.surrender_loss())], insurance_payout
+
+        if any(hand.value <= 21 for hand in self.player_hands):
+            self.dealer_plays()
+        self.game_over = True
+
+        results = []
+        for hand, bet in zip(self.player_hands, self.hand_bets):
+            result, multiplier = self._hand_result(hand)
+            results.append((result, int(bet * multiplier)))
+        return results, insurance_payout
+
+    # --- Hints ---
+    def unseen_shoe(self) -> Shoe:
+        """Cards the player cannot see: the rest of the deck plus the dealer's hole card."""
+        return shoe_composition(self.deck.cards + self.dealer_hand.cards[1:2])
+
+    def stand_hint(self) -> float:
+        """Expected result per unit bet of standing on the current hand right now."""
+        upcard_value = VALUES[self.dealer_hand.cards[0][0]]
+        outcome = dealer_outcome_probabilities(upcard_value, self.unseen_shoe())
+        return stand_expected_value(self.player_hand.value, outcome)
@@ -0,0 +1,911 @@
+# Telegram front end. main.py imports this only after loading the environment.
+import asyncio
+import os
+from functools import lru_cache
+import random
+import signal
+from typing import Dict, NamedTuple, Set, Tuple
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import Application, BaseUpdateProcessor, CommandHandler, CallbackQueryHandler, ContextTypes
+
+from blackjack import BlackjackGame, dealer_cache_sizes
+from poker import MULTI_HAND_COUNTS, MultiHandPokerGame, VideoPokerGame
+from engine import GAME_IN_PROGRESS, STARTING_BALANCE, VALID_ROULETTE_BETS, CasinoService, GameResult
+from profiling import PROFILING_ENABLED, track_handler, lag_monitor, profiler_session
+import profiling
+from diagnostics import memory_tracker
+from snapshots import SNAPSHOT_INTERVAL, SnapshotBuilder, read_snapshot, write_snapshot
+from response_cache import BalanceCache, MessageRenderCache
+from guard import RATE_LIMIT_MESSAGE
+from scheduler import MAX_QUEUED_UPDATES, KeyedScheduler, MailboxFull
+
+# Comma-separated Telegram user ids allowed to use the admin commands
+ADMIN_IDS = {int(uid) for uid in os.getenv('ADMIN_IDS', '').split(',') if uid.strip()}
+
+# Game engine: wallets, open games, bet guard and stats. The handlers below only translate
+# Telegram updates into engine calls and render the results.
+casino = CasinoService()
+_snapshot_task = None        # Background task that periodically snapshots the engine's stores
+_config_task = None          # Background task that reloads the game config when its file changes
+_reload_tasks: Set[asyncio.Task] = set()  # SIGHUP reloads in flight, referenced so they can't be garbage-collected
+
+# --- Static Responses (built once at import) ---
+def _bet_amount_rows(bet_amounts: Tuple[int, ...], callback_prefix: str, callback_suffix: str = '') -> list:
+    """Rows of two bet-amount buttons whose callback data is callback_prefix + amount + callback_suffix."""
+    buttons = [InlineKeyboardButton(str(amount), callback_data=f'{callback_prefix}{amount}{callback_suffix}') for amount in bet_amounts]
+    return [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+
+MAIN_MENU_TEXT = "¡Bienvenido al Casino! Elige un juego para jugar:"
+MAIN_MENU_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Roulette 🎡", callback_data='menu_roulette')],
+    [InlineKeyboardButton("Blackjack ♠️", callback_data='menu_blackjack')],
+    [InlineKeyboardButton("Video Poker 🃏", callback_data='menu_poker')],
+])
+
+_ROULETTE_TYPE_ROWS = [
+    [
+        InlineKeyboardButton("Rojo 🔴", callback_data='roulette_type_red'),
+        InlineKeyboardButton("Negro ⚫", callback_data='roulette_type_black'),
+    ],
+    [
+        InlineKeyboardButton("Par", callback_data='roulette_type_even'),
+        InlineKeyboardButton("Impar", callback_data='roulette_type_odd'),
+    ],
+    [
+        InlineKeyboardButton("Bajo (1-18)", callback_data='roulette_type_low'),
+        InlineKeyboardButton("Alto (19-36)", callback_data='roulette_type_high'),
+    ],
+    [
+        InlineKeyboardButton("Más Opciones ➡️", callback_data='roulette_more')
+    ],
+]
+ROULETTE_TYPE_TEXT = "🎡 Ruleta: Elige tu tipo de apuesta:"
+ROULETTE_TYPE_MARKUP = InlineKeyboardMarkup(_ROULETTE_TYPE_ROWS)
+ROULETTE_MENU_MARKUP = InlineKeyboardMarkup(
+    _ROULETTE_TYPE_ROWS + [[InlineKeyboardButton("Volver al Menú Principal ⏪", callback_data='menu_main')]]
+)
+ROULETTE_MORE_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("1ra Docena (1-12)", callback_data='roulette_type_1st12'),
+        InlineKeyboardButton("1ra Columna", callback_data='roulette_type_col1'),
+    ],
+    [
+        InlineKeyboardButton("2da Docena (13-24)", callback_data='roulette_type_2nd12'),
+        InlineKeyboardButton("2da Columna", callback_data='roulette_type_col2'),
+    ],
+    [
+        InlineKeyboardButton("3ra Docena (25-36)", callback_data='roulette_type_3rd12'),
+        InlineKeyboardButton("3ra Columna", callback_data='roulette_type_col3'),
+    ],
+    [InlineKeyboardButton("⏪ Volver", callback_data='menu_roulette')]
+])
+
+# Map callback data to user-friendly text and canonical bet type
+ROULETTE_BET_TYPE_MAP = {
+    'red': ('Rojo 🔴', 'red'),
+    'black': ('Negro ⚫', 'black'),
+    'even': ('Par', 'even'),
+    'odd': ('Impar', 'odd'),
+    'low': ('Bajo (1-18)', 'low'),
+    'high': ('Alto (19-36)', 'high'),
+    '1st12': ('1ra Docena (1-12)', '1st12'),
+    '2nd12': ('2da Docena (13-24)', '2nd12'),
+    '3rd12': ('3ra Docena (25-36)', '3rd12'),
+    'col1': ('1ra Columna', 'col1'),
+    'col2': ('2da Columna', 'col2'),
+    'col3': ('3ra Columna', 'col3'),
+}
+
+MULTI_HAND_NAMES = {3: "Triple Play", 10: "Ten Play"}
+_POKER_MODE_ROW = [
+    InlineKeyboardButton(f"{MULTI_HAND_NAMES[num_hands]} x{num_hands}", callback_data=f'poker_mode_{num_hands}')
+    for num_hands in MULTI_HAND_COUNTS
+]
+POKER_BET_TEXT = "Elige tu apuesta para Video Poker:"
+
+BLACKJACK_BET_TEXT = "Elige tu apuesta para el Blackjack:"
+BLACKJACK_MENU_TEXT = "<b>Blackjack</b> ♠️\n\nUsa el comando <code>/blackjack &lt;cantidad&gt;</code> para iniciar una partida."
+BLACKJACK_MENU_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("Volver ⏪", callback_data='menu_main')]])
+BLACKJACK_RESULT_TEXT = {
+    'blackjack': "¡BLACKJACK! ¡Ganaste {amount}! 🤑",
+    'win': "¡GANAS {amount}! 🎉",
+    'loss': "HAS PERDIDO {amount}. 😔",
+    'bust': "💥 ¡TE PASASTE! 💥 Has perdido {amount}.",
+    'push': "Es un EMPATE. Se te devuelve la apuesta.",
+    'surrender': "Te rindes. Pierdes la mitad de tu apuesta ({amount}).",
+}
+
+# Bet keyboards depend on the configured amounts, so they are built once per set of amounts
+class BetMarkups(NamedTuple):
+    roulette: Dict[str, InlineKeyboardMarkup]    # {canonical bet type: amount keyboard}
+    poker: InlineKeyboardMarkup
+    poker_menu: InlineKeyboardMarkup
+    poker_multi: Dict[int, InlineKeyboardMarkup]  # {num_hands: amount keyboard}
+    blackjack: InlineKeyboardMarkup
+
+@lru_cache(maxsize=4)
+def _build_bet_markups(bet_amounts: Tuple[int, ...]) -> BetMarkups:
+    return BetMarkups(
+        roulette={
+            canonical_type: InlineKeyboardMarkup(_bet_amount_rows(bet_amounts, f'roulette_play_{canonical_type}_'))
+            for _, canonical_type in ROULETTE_BET_TYPE_MAP.values()
+        },
+        poker=InlineKeyboardMarkup(_bet_amount_rows(bet_amounts, 'poker_bet_') + [_POKER_MODE_ROW]),
+        poker_menu=InlineKeyboardMarkup(
+            _bet_amount_rows(bet_amounts, 'poker_bet_') + [_POKER_MODE_ROW, [InlineKeyboardButton("Volver al Menú Principal ⏪", callback_data='menu_main')]]
+        ),
+        poker_multi={
+            num_hands: InlineKeyboardMarkup(
+                _bet_amount_rows(bet_amounts, 'poker_bet_', f'_{num_hands}') + [[InlineKeyboardButton("⏪ Volver", callback_data='menu_poker')]]
+            )
+            for num_hands in MULTI_HAND_COUNTS
+        },
+        blackjack=InlineKeyboardMarkup(_bet_amount_rows(bet_amounts, 'bj_bet_')),
+    )
+
+def _bet_markups() -> BetMarkups:
+    """Bet keyboards for the current game config."""
+    return _build_bet_markups(casino.config.current.bet_amounts)
+
+HELP_TEXT = (
+    "<b>--- Comandos Generales ---</b>\n\n"
+    "<b>/start</b> - Inicializa tu cuenta\n"
+    "<b>/games</b> - Muestra el menú principal de juegos\n"
+    "<b>/balance</b> - Consulta tu saldo actual\n"
+    "<b>/stats</b> - Tus estadísticas por juego\n"
+    "<b>/top</b> - Clasificación de los jugadores con más saldo\n\n"
+    "<b>--- Ruleta ---</b>\n\n"
+    "<b>/roulette</b> - Inicia una apuesta interactiva.\n"
+    "<b>/roulette &lt;cantidad&gt; &lt;tipo&gt;</b> - Apuesta directamente (ej: <code>/roulette 10 rojo</code>).\n"
+    "<b>Tipos de Apuesta:</b>\n"
+    "  • <b>Número:</b> Un número del 0 al 36 (ej: <code>17</code>)\n"
+    "  • <b>Colores:</b> <code>rojo</code>, <code>negro</code>\n"
+    "  • <b>Pares/Impares:</b> <code>par</code>, <code>impar</code>\n"
+    "  • <b>Altos/Bajos:</b> <code>alto</code> (19-36), <code>bajo</code> (1-18)\n"
+    "  • <b>Docenas:</b> <code>1ra12</code> (1-12), <code>2da12</code> (13-24), <code>3ra12</code> (25-36)\n"
+    "  • <b>Columnas:</b> <code>columna1</code>, <code>columna2</code>, <code>columna3</code>\n\n"
+    "<b>--- Blackjack ---</b>\n\n"
+    "<b>/blackjack</b> - Inicia una apuesta interactiva de Blackjack.\n"
+    "<b>/blackjack &lt;cantidad&gt;</b> - Comienza un juego con una apuesta específica.\n"
+    "Durante la partida puedes <b>Doblar</b>, <b>Dividir</b> parejas, tomar <b>Seguro</b> contra un As del crupier o <b>Rendirte</b> y recuperar la mitad.\n\n"
+    "<b>--- Video Poker ---</b>\n\n"
+    "<b>/poker</b> - Inicia una apuesta interactiva de Video Poker.\n"
+    "<b>/poker &lt;cantidad&gt;</b> - Comienza un juego con una apuesta específica.\n"
+    "<b>/poker &lt;cantidad&gt; &lt;manos&gt;</b> - Juega 3 o 10 manos a la vez (Triple/Ten Play). La apuesta es por mano.\n\n"
+    "Durante una partida de Blackjack o Poker, usa los botones en lugar de los comandos."
+)
+
+async def _load_balance(user_id: int) -> int:
+    """Reads a balance from the backing store (in-memory for now)."""
+    return casino.get_balance(user_id)
+
+def _render_balance(current_balance: int) -> str:
+    return f"Tu saldo actual es: {current_balance}"
+
+balance_cache = BalanceCache(_load_balance, _render_balance)
+casino.balance_listeners.append(balance_cache.invalidate)
+
+# Last text and keyboard shown in each message, so repeated taps don't resend identical edits
+render_cache = MessageRenderCache()
+
+GAME_DISPLAY_NAMES = {'roulette': 'Ruleta 🎡', 'blackjack': 'Blackjack ♠️', 'poker': 'Video Poker 🃏'}
+
+async def _reply_refusal(update: Update, result: GameResult, is_callback: bool) -> None:
+    """Tells the user why the engine refused a request."""
+    if result.error == RATE_LIMIT_MESSAGE and is_callback:
+        return  # Drop tap-spam without spending another API call on it
+    if is_callback:
+        await render_cache.edit(update.callback_query, result.error, reply_markup=None)
+    else:
+        await update.message.reply_text(result.error)
+
+async def games_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Sends a message with the main game menu."""
+    await update.message.reply_text(MAIN_MENU_TEXT, reply_markup=MAIN_MENU_MARKUP)
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    if casino.open_account(user_id):
+        await update.message.reply_text(f"¡Bienvenido! He creado una cuenta para ti con un saldo inicial de {STARTING_BALANCE}.")
+
+    await games_menu(update, context)
+
+async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Sends a message when the command /help is issued."""
+    await update.message.reply_text(HELP_TEXT, parse_mode='HTML')
+
+
+async def _execute_roulette_spin(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int, bet_amount: int, bet_type: str, is_callback: bool):
+    """
+    Handles the core logic of a roulette spin and sends the result message.
+    Can be called from a command or a callback query.
+    """
+    result = await casino.place_bet(user_id, 'roulette', bet_amount, bet_type=bet_type)
+    if result.error:
+        await _reply_refusal(update, result, is_callback)
+        return
+
+    winning_number = result.details['winning_number']
+    winning_color = result.details['color']
+    color_emoji = "🟢" if winning_color == "green" else ("🔴" if winning_color == "red" else "⚫")
+    outcome, new_balance = result.payout, result.balance
+
+    base_message = (
+        f"Girando la ruleta... 🎡\n"
+        f"La bola ha caído en: {color_emoji} {winning_number}!\n\n"
+    )
+
+    if outcome > 0:
+        win_messages = [
+            f"🎉 ¡Cha-ching! ¡GANASTE {outcome}! Tu billetera ahora está más gorda: 💰 {new_balance}",
+            f"¡SÍ! ¡La ruleta te favorece! Unos geniales {outcome} créditos son tuyos. Nuevo balance: 💰 {new_balance}",
+            f"🥳 ¡Ganador, ganador, cena de pollo! ¡Has ganado {outcome}! Balance total: 💰 {new_balance}",
+        ]
+        message = base_message + random.choice(win_messages)
+    else:
+        loss_messages = [
+            f"Vaya. La casa gana esta vez. Has perdido {abs(outcome)}. Tu saldo ahora es: 💰 {new_balance}",
+            f"¡Casi! La suerte no está de tu lado. Has perdido {abs(outcome)}. Saldo restante: 💰 {new_balance}",
+            f"Esta vez no pudo ser. La ruleta no giró a tu favor. Has perdido {abs(outcome)}. Te quedan 💰 {new_balance}.",
+        ]
+        message = base_message + f"😔 {random.choice(loss_messages)}"
+
+    if is_callback:
+        await render_cache.edit(update.callback_query, text=message, reply_markup=None)
+    else:
+        await update.message.reply_text(message)
+
+
+async def roulette(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Realiza una apuesta en la ruleta, ya sea por comando o interactivamente."""
+    user_id = update.effective_user.id
+
+    # Case 1: /roulette -> Show interactive bet type selection
+    if len(context.args) == 0:
+        await update.message.reply_text(ROULETTE_TYPE_TEXT, reply_markup=ROULETTE_TYPE_MARKUP)
+        return
+
+    # Case 2: /roulette <amount> <type> -> Direct play
+    if len(context.args) < 2:
+        await update.message.reply_text("Uso: /roulette <cantidad> <tipo> o simplemente /roulette para elegir de una lista.")
+        return
+
+    try:
+        bet_type_translations = {
+            "rojo": "red", "negro": "black", "verde": "green",
+            "par": "even", "impar": "odd",
+            "alto": "high", "bajo": "low",
+            "1ra12": "1st12", "2da12": "2nd12", "3ra12": "3rd12",
+            "columna1": "col1", "columna2": "col2", "columna3": "col3",
+        }
+        bet_amount = int(context.args[0])
+        raw_bet_type = " ".join(context.args[1:]).lower()
+        bet_type = bet_type_translations.get(raw_bet_type, raw_bet_type) # Translate if found
+    except ValueError:
+        await update.message.reply_text("Cantidad inválida. Por favor, introduce un número.")
+        return #Mensaje de cantidad invalida
+
+    if bet_type not in VALID_ROULETTE_BETS:
+        await update.message.reply_text(
+            f"Tipo de apuesta inválido: '{raw_bet_type}'.\n"
+            "Por favor, usa un número (0-36), un color (rojo/negro/verde), "
+            "o tipos comunes (par/impar, alto/bajo, 1ra12, columna1, etc.)."
+        )
+        return
+
+    # Call the helper to execute the spin
+    await _execute_roulette_spin(update, context, user_id, bet_amount, bet_type, is_callback=False)
+
+async def poker_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Starts a new game of Video Poker."""
+    user_id = update.effective_user.id
+
+    if casino.has_game(user_id, 'poker'):
+        await update.message.reply_text(GAME_IN_PROGRESS['poker'])
+        return
+
+    # Case 1: /poker (no arguments) -> Show bet buttons
+    if len(context.args) == 0:
+        await update.message.reply_text(POKER_BET_TEXT, reply_markup=_bet_markups().poker)
+        return
+
+    # Case 2: /poker <amount> [hands]
+    if len(context.args) in (1, 2):
+        try:
+            bet_amount = int(context.args[0])
+            num_hands = int(context.args[1]) if len(context.args) == 2 else 1
+        except ValueError:
+            await update.message.reply_text("Cantidad inválida. Por favor, introduce un número.")
+            return
+    else: # Case 3: Invalid arguments
+        await update.message.reply_text("Uso: /poker <cantidad> [manos] o simplemente /poker para elegir de una lista.")
+        return
+
+    # Start the game and send the first message
+    await _start_poker_game(update, context, user_id, bet_amount, is_callback=False, num_hands=num_hands)
+
+async def _start_poker_game(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int, bet_amount: int, is_callback: bool, num_hands: int = 1):
+    """Helper function to start a poker game through the engine, sending the initial message."""
+    result = await casino.place_bet(user_id, 'poker', bet_amount, num_hands=num_hands)
+    if result.error:
+        await _reply_refusal(update, result, is_callback)
+        return
+
+    game = result.state
+    if num_hands > 1:
+        title = f"🃏 ¡Video Poker {MULTI_HAND_NAMES[num_hands]}! Apuesta: {bet_amount} x {num_hands} manos"
+    else:
+        title = f"🃏 ¡Video Poker! Apuesta: {bet_amount}"
+
+    keyboard = _build_poker_keyboard(game)
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    message_text = (
+        f"{title}\n\n"
+        f"<b>Tu mano:</b> {game.get_hand_str()}\n\n"
+        "Selecciona las cartas que quieres conservar y luego pulsa 'Robar'."
+    )
+
+    if is_callback:
+        await render_cache.edit(update.callback_query, text=message_text, parse_mode='HTML', reply_markup=reply_markup)
+    else:
+        sent = await update.message.reply_text(text=message_text, parse_mode='HTML', reply_markup=reply_markup)
+        render_cache.remember(sent, message_text, reply_markup, parse_mode='HTML')
+
+def _build_poker_keyboard(game: VideoPokerGame) -> list:
+    """Builds the dynamic keyboard for the poker game, showing hold status."""
+    hold_buttons = [InlineKeyboardButton(f"{'✅ ' if game.held_indices[i] else ''}{card[0]}{card[1]}", callback_data=f'poker_hold_{i}') for i, card in enumerate(game.hand)]
+    keyboard = [hold_buttons, [InlineKeyboardButton("Robar Cartas ➡️", callback_data='poker_draw')]]
+    return keyboard
+
+async def balance(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    await update.message.reply_text(await balance_cache.get(user_id))
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows the user's per-game stats."""
+    user_id = update.effective_user.id
+    user_stats = casino.stats.user_stats(user_id)
+    if not user_stats:
+        await update.message.reply_text("Todavía no has jugado ninguna partida. ¡Prueba suerte con /games!")
+        return
+
+    lines = ["<b>--- Tus Estadísticas ---</b>\n"]
+    for game, counters in user_stats.items():
+        win_rate = counters['won'] / counters['played'] * 100
+        lines.append(
+            f"<b>{GAME_DISPLAY_NAMES[game]}</b>\n"
+            f"Partidas: {counters['played']} | Ganadas: {win_rate:.1f}%\n"
+            f"Mayor premio: {counters['biggest_win']} | Neto: {counters['net']:+d}\n"
+        )
+    await update.message.reply_text('\n'.join(lines), parse_mode='HTML')
+
+async def top_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows the players with the highest balance."""
+    top_players = casino.stats.top(10)
+    if not top_players:
+        await update.message.reply_text("Aún no hay jugadores en la clasificación.")
+        return
+
+    medals = ["🥇", "🥈", "🥉"]
+    lines = ["<b>--- Mejores Jugadores ---</b>\n"]
+    for position, (user_id, score) in enumerate(top_players):
+        prefix = medals[position] if position < len(medals) else f"{position + 1}."
+        lines.append(f"{prefix} <code>{user_id}</code> - 💰 {score}")
+    await update.message.reply_text('\n'.join(lines), parse_mode='HTML')
+
+
+async def blackjack_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comienza un nuevo juego de blackjack."""
+    user_id = update.effective_user.id
+
+    if casino.has_game(user_id, 'blackjack'):
+        await update.message.reply_text(GAME_IN_PROGRESS['blackjack'])
+        return
+
+    # Case 1: /blackjack (no arguments) -> Show bet buttons
+    if len(context.args) == 0:
+        await update.message.reply_text(BLACKJACK_BET_TEXT, reply_markup=_bet_markups().blackjack)
+        return
+
+    # Case 2: /blackjack <amount>
+    if len(context.args) == 1:
+        try:
+            bet_amount = int(context.args[0])
+        except ValueError:
+            await update.message.reply_text("Cantidad inválida. Por favor, introduce un número.")
+            return
+    else: # Case 3: Invalid arguments
+        await update.message.reply_text("Uso: /blackjack <cantidad> o simplemente /blackjack para elegir de una lista.")
+        return
+
+    await _start_blackjack_game(update, context, user_id, bet_amount, is_callback=False)
+
+@lru_cache(maxsize=None)
+def _blackjack_action_markup(can_double: bool, can_split: bool, can_insure: bool, can_surrender: bool) -> InlineKeyboardMarkup:
+    """Action keyboard for a set of available moves. Each combination is only built once."""
+    keyboard = [[InlineKeyboardButton("Pedir", callback_data='bj_hit'), InlineKeyboardButton("Plantarse", callback_data='bj_stand')]]
+    row = []
+    if can_double:
+        row.append(InlineKeyboardButton("Doblar ✖️2", callback_data='bj_double'))
+    if can_split:
+        row.append(InlineKeyboardButton("Dividir ✂️", callback_data='bj_split'))
+    if row:
+        keyboard.append(row)
+    row = []
+    if can_insure:
+        row.append(InlineKeyboardButton("Seguro 🛡️", callback_data='bj_insurance'))
+    if can_surrender:
+        row.append(InlineKeyboardButton("Rendirse 🏳️", callback_data='bj_surrender'))
+    if row:
+        keyboard.append(row)
+    return InlineKeyboardMarkup(keyboard)
+
+def _blackjack_keyboard(user_id: int, game: BlackjackGame) -> InlineKeyboardMarkup:
+    """Offers only the moves the rules allow and the user's balance can cover."""
+    options = casino.blackjack_options(user_id, game)
+    return _blackjack_action_markup(options['double'], options['split'], options['insurance'], options['surrender'])
+
+def _blackjack_hands_text(game: BlackjackGame, reveal_dealer: bool) -> str:
+    """Renders the player's hands and the dealer's hand (or upcard)."""
+    sections = []
+    if len(game.player_hands) == 1:
+        sections.append(f"<b>Tu mano (Valor: {game.player_hand.value})</b>\n{game.player_hand}\n")
+    else:
+        for i, (hand, bet) in enumerate(zip(game.player_hands, game.hand_bets)):
+            marker = "👉 " if i == game.active_hand else ""
+            sections.append(f"<b>{marker}Mano {i + 1} (Valor: {hand.value}, Apuesta: {bet})</b>\n{hand}\n")
+    if reveal_dealer:
+        sections.append(f"<b>Mano del crupier (Valor: {game.dealer_hand.value})</b>\n{game.dealer_hand}\n")
+    else:
+        upcard = game.dealer_hand.cards[0]
+        sections.append(f"<b>El crupier muestra</b>\n{upcard[0]}{upcard[1]} ❔\n")
+    return "\n".join(sections) + "\n"
+
+def _blackjack_turn_text(game: BlackjackGame, header: str) -> str:
+    """Message shown while the player still has decisions to make."""
+    insurance = f"🛡️ Seguro: {game.insurance_bet}\n" if game.insurance_bet else ""
+    return (
+        header
+        + _blackjack_hands_text(game, reveal_dealer=False)
+        + insurance
+        + f"💡 Valor esperado si te plantas: {game.stand_hint():+.2f} por ficha\n\n"
+        + "¿Cuál es tu jugada?"
+    )
+
+def _blackjack_result_text(result: GameResult, header: str) -> str:
+    """Result message for a game the engine has settled."""
+    game = result.state
+    results, insurance_payout = result.details['results'], result.details['insurance_payout']
+    lines = []
+    for i, (hand_result, payout) in enumerate(results):
+        prefix = f"Mano {i + 1}: " if len(results) > 1 else ""
+        lines.append(prefix + BLACKJACK_RESULT_TEXT[hand_result].format(amount=abs(payout)))
+    if game.insurance_bet > 0:  # Only mention insurance when it was taken
+        if insurance_payout > 0:
+            lines.append(f"🛡️ ¡El crupier tenía Blackjack! El seguro paga {insurance_payout}.")
+        else:
+            lines.append(f"🛡️ Pierdes el seguro ({game.insurance_bet}).")
+
+    # The dealer's hand is shown whenever it decided something: a live hand or an insurance bet
+    reveal_dealer = bool(game.insurance_bet) or (not game.surrendered and any(hand.value <= 21 for hand in game.player_hands))
+    return (
+        header
+        + _blackjack_hands_text(game, reveal_dealer=reveal_dealer)
+        + "\n".join(lines)
+        + f"\nTu nuevo saldo es 💰 {result.balance}."
+    )
+
+async def _start_blackjack_game(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int, bet_amount: int, is_callback: bool):
+    """Starts a blackjack game through the engine; a natural blackjack comes back already settled."""
+    result = await casino.place_bet(user_id, 'blackjack', bet_amount)
+    if result.error:
+        await _reply_refusal(update, result, is_callback)
+        return
+
+    game = result.state
+    if result.finished:
+        message = _blackjack_result_text(result, "🎉 <b>¡BLACKJACK!</b> 🎉\n\n")
+        reply_markup = None
+    else:
+        message = _blackjack_turn_text(game, f"♠️ ¡Partida de Blackjack iniciada con una apuesta de {bet_amount}! ♥️\n\n")
+        reply_markup = _blackjack_keyboard(user_id, game)
+
+    if is_callback:
+        await render_cache.edit(update.callback_query, text=message, parse_mode='HTML', reply_markup=reply_markup)
+    else:
+        sent = await update.message.reply_text(message, parse_mode='HTML', reply_markup=reply_markup)
+        render_cache.remember(sent, message, reply_markup, parse_mode='HTML')
+
+async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles all button presses from inline keyboards."""
+    query = update.callback_query
+    await query.answer()  # Acknowledge the button press
+
+    data = query.data
+    user_id = query.from_user.id
+
+    # --- Menu Routing ---
+    if data == 'menu_main':
+        await render_cache.edit(query, text=MAIN_MENU_TEXT, reply_markup=MAIN_MENU_MARKUP)
+        return
+
+    if data == 'menu_roulette':
+        await render_cache.edit(query, text=ROULETTE_TYPE_TEXT, reply_markup=ROULETTE_MENU_MARKUP)
+        return
+    if data == 'menu_blackjack':
+        await render_cache.edit(query, text=BLACKJACK_MENU_TEXT, parse_mode='HTML', reply_markup=BLACKJACK_MENU_MARKUP)
+        return
+    if data == 'menu_poker':
+        await render_cache.edit(query, text=POKER_BET_TEXT, reply_markup=_bet_markups().poker_menu)
+        return
+    if data.startswith('poker_mode_'):
+        try:
+            num_hands = int(data.split('_')[2])
+            reply_markup = _bet_markups().poker_multi[num_hands]
+        except (ValueError, IndexError, KeyError):
+            await render_cache.edit(query, "Error al procesar la apuesta. Por favor, inténtalo de nuevo.")
+            return
+        await render_cache.edit(
+            query,
+            text=f"Video Poker {MULTI_HAND_NAMES[num_hands]}: elige tu apuesta por mano (se juegan {num_hands} manos):",
+            reply_markup=reply_markup
+        )
+        return
+
+    if data == 'roulette_more':
+        await render_cache.edit(
+            query,
+            text="🎡 Ruleta: Apuestas por Docenas y Columnas:",
+            reply_markup=ROULETTE_MORE_MARKUP
+        )
+        return
+
+    # --- Roulette Bet Selection ---
+    if data.startswith('roulette_type_'):
+        bet_type = data.split('_')[2]
+
+        display_text, canonical_type = ROULETTE_BET_TYPE_MAP.get(bet_type, ("Desconocido", None))
+
+        if not canonical_type:
+            await render_cache.edit(query, "Error: Tipo de apuesta no reconocido.")
+            return
+
+        await render_cache.edit(
+            query,
+            f"Apuesta: {display_text}\n\nElige la cantidad a apostar:",
+            reply_markup=_bet_markups().roulette[canonical_type]
+        )
+        return
+
+    if data.startswith('roulette_play_'):
+        parts = data.split('_')
+        try:
+            bet_type = parts[2]
+            bet_amount = int(parts[3])
+        except (IndexError, ValueError):
+            await render_cache.edit(query, "Error al procesar la apuesta. Inténtalo de nuevo.")
+            return
+
+        await _execute_roulette_spin(update, context, user_id, bet_amount, bet_type, is_callback=True)
+        return
+
+    # --- Video Poker Bet Selection ---
+    if data.startswith('poker_bet_'):
+        if casino.has_game(user_id, 'poker'):
+            await query.answer(GAME_IN_PROGRESS['poker'], show_alert=True)
+            return
+
+        parts = data.split('_')
+        try:
+            bet_amount = int(parts[2])
+            num_hands = int(parts[3]) if len(parts) > 3 else 1
+        except (ValueError, IndexError):
+            await render_cache.edit(query, "Error al procesar la apuesta. Por favor, inténtalo de nuevo.")
+            return
+
+        await _start_poker_game(update, context, user_id, bet_amount, is_callback=True, num_hands=num_hands)
+        return
+
+    # --- Video Poker Game Logic ---
+    if data.startswith('poker_hold_'):
+        result = await casino.act(user_id, 'poker', 'hold', index=int(data.split('_')[2]))
+        if result.error:
+            if result.state is None:  # The game has expired
+                await render_cache.edit(query, result.error)
+            return
+
+        keyboard = _build_poker_keyboard(result.state)
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        await render_cache.edit(query, None, reply_markup=reply_markup)
+        return
+
+    if data == 'poker_draw':
+        result = await casino.act(user_id, 'poker', 'draw')
+        if result.error:
+            await render_cache.edit(query, result.error)
+            return
+        game, payout = result.state, result.payout
+        if isinstance(game, MultiHandPokerGame):
+            hand_lines = [
+                f"{i + 1}. {hand_str} - {hand_name} ({hand_payout:+d})"
+                for i, (hand_str, (hand_name, hand_payout)) in enumerate(zip(game.get_hands_str(), game.results))
+            ]
+            result_message = (
+                f"Robando cartas para {game.num_hands} manos...\n\n"
+                + "\n".join(hand_lines) + "\n\n"
+            )
+        else:
+            result_message = (
+                f"Robando cartas...\n\n"
+                f"<b>Mano Final:</b> {game.get_hand_str()}\n"
+                f"<b>Resultado:</b> {result.details['hand_name']}!\n\n"
+            )
+        if payout > 0:
+            result_message += f"¡Felicidades! ¡Ganaste {payout}! 🤑\nTu nuevo saldo es 💰 {result.balance}."
+        elif payout == 0:  # E.g. multi-hand wins that exactly cover the losing hands
+            result_message += f"Quedas igual: ni ganas ni pierdes. 🤝\nTu saldo es 💰 {result.balance}."
+        else:
+            result_message += f"No hubo suerte esta vez. Perdiste {abs(payout)}. 😔\nTu saldo es 💰 {result.balance}."
+
+        await render_cache.edit(query, text=result_message, parse_mode='HTML', reply_markup=None)
+        return
+
+    # --- Blackjack Bet Selection ---
+    if data.startswith('bj_bet_'):
+        if casino.has_game(user_id, 'blackjack'):
+            await query.answer(GAME_IN_PROGRESS['blackjack'], show_alert=True)
+            return
+
+        try:
+            bet_amount = int(data.split('_')[2])
+        except (ValueError, IndexError):
+            await render_cache.edit(query, "Error al procesar la apuesta. Por favor, inténtalo de nuevo.")
+            return
+
+        await _start_blackjack_game(update, context, user_id, bet_amount, is_callback=True)
+        return
+
+    # --- Blackjack Game Logic ---
+    result = await casino.act(user_id, 'blackjack', data[len('bj_'):])
+    game = result.state
+    if game is None:
+        await render_cache.edit(query, result.error)
+        return
+
+    if result.error:  # Stale button or a move that is no longer allowed
+        header = f"{result.error}\n\n"
+    elif result.action == 'hit':
+        if result.details['busted'] and result.finished:
+            header = "Tu mano final:\n\n"
+        elif result.details['busted']:
+            header = f"💥 ¡Te pasaste! Ahora juegas la mano {game.active_hand + 1}.\n\n"
+        else:
+            header = "¡Has pedido carta! Aquí está tu nueva mano:\n\n"
+    elif result.action == 'stand':
+        if result.finished:
+            header = f"Te plantas con {result.details['stood_value']}. El crupier revela su mano...\n\n"
+        else:
+            header = f"Te plantas con {result.details['stood_value']}. Ahora juegas la mano {game.active_hand + 1}.\n\n"
+    elif result.action == 'double':
+        header = "Doblas tu apuesta y recibes una sola carta.\n\n"
+    elif result.action == 'split':
+        header = "Divides tu pareja en dos manos.\n\n"
+    elif result.action == 'insurance':
+        header = f"Has tomado un seguro de {game.insurance_bet}.\n\n"
+    else:
+        header = "🏳️ Has decidido rendirte.\n\n"
+
+    if result.finished:
+        message = _blackjack_result_text(result, header)
+        await render_cache.edit(query, text=message, parse_mode='HTML', reply_markup=None)
+    else:
+        message = _blackjack_turn_text(game, header)
+        await render_cache.edit(query, text=message, parse_mode='HTML', reply_markup=_blackjack_keyboard(user_id, game))
+
+# Error handler
+async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Log the error and attempt to send a user-facing message."""
+    print(f"Update {update} caused error {context.error}")
+
+    # Try to find a chat_id to reply to, making the handler more robust
+    chat_id = None
+    if isinstance(update, Update) and update.effective_chat:
+        chat_id = update.effective_chat.id
+
+    if chat_id:
+        try:
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text="Ha ocurrido un error al procesar tu solicitud. Por favor, inténtalo de nuevo o usa /help."
+            )
+        except Exception as e:
+            print(f"Failed to send error message to chat {chat_id}: {e}")
+
+# --- Admin Commands ---
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Admin-only: shows handler timings and loop lag, and toggles the on-demand profiler."""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+
+    action = context.args[0].lower() if context.args else 'report'
+    if action == 'start':
+        mode = context.args[1].lower() if len(context.args) > 1 else 'cprofile'
+        try:
+            profiler_session.start(mode)
+        except (RuntimeError, ValueError) as e:
+            await update.message.reply_text(f"No se pudo iniciar el profiler: {e}")
+            return
+        await update.message.reply_text(f"Profiler '{mode}' iniciado. Usa /profile stop para guardarlo.")
+    elif action == 'stop':
+        try:
+            write_dump = profiler_session.stop()
+        except RuntimeError as e:
+            await update.message.reply_text(str(e))
+            return
+        path = await asyncio.to_thread(write_dump)
+        await update.message.reply_text(f"Perfil guardado en {path}")
+    elif action == 'stalls':
+        path = await asyncio.to_thread(profiling.dump_stall_stacks)
+        await update.message.reply_text(f"Pilas de bloqueos guardadas en {path}")
+    else:
+        await update.message.reply_text(profiling.build_report())
+
+async def memory_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Admin-only: deep size of every in-memory store, allocation sites and growth since the last call."""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+
+    stores = {
+        'balances': casino.balances,
+        'blackjack_games': casino.blackjack_games,
+        'poker_games': casino.poker_games,
+        'stats': casino.stats,
+        'bet_guard': casino.guard,
+        'balance_cache': balance_cache,
+        'render_cache': render_cache,
+        'update_mailboxes': update_scheduler.mailboxes,
+        'user_data': context.application.user_data,
+        'chat_data': context.application.chat_data,
+    }
+    # lru_cache contents can't be walked, so only their entry counts are reported
+    counters = {
+        'blackjack_keyboards': _blackjack_action_markup.cache_info().currsize,
+        'bet_keyboards': _build_bet_markups.cache_info().currsize,
+        **dealer_cache_sizes(),
+    }
+    report = memory_tracker.store_report(stores, counters)
+    # Snapshot statistics take seconds with tracemalloc on, so they run off the event loop
+    allocations = await asyncio.to_thread(memory_tracker.allocation_report)
+    await update.message.reply_text(f"{report}\n\n{allocations}")
+
+# --- Snapshots ---
+# Keeps encoded games between snapshots so each one only re-encodes what changed
+snapshot_builder = SnapshotBuilder()
+casino.game_listeners.append(snapshot_builder.mark_changed)
+
+def _take_snapshot() -> dict:
+    """Encodes balances and changed games. Runs on the loop so the stores are not mutated mid-copy."""
+    return snapshot_builder.build(casino.balances, casino.blackjack_games, casino.poker_games)
+
+async def _snapshot_loop() -> None:
+    """Periodically writes a snapshot; the file I/O happens off the event loop."""
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        try:
+            await asyncio.to_thread(write_snapshot, _take_snapshot())
+        except Exception as e:
+            print(f"Failed to write snapshot: {e}")
+
+def restore_snapshot() -> None:
+    """Restores balances and in-flight games saved by a previous run."""
+    try:
+        restored = read_snapshot()
+    except Exception as e:
+        print(f"Failed to read snapshot: {e}")
+        return
+    if restored is None:
+        return
+    balances, blackjack_games, poker_games = restored
+    casino.restore(balances, blackjack_games, poker_games)
+    print(f"Restored {len(blackjack_games)} blackjack and {len(poker_games)} poker games from snapshot.")
+
+# --- Update Scheduling ---
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates from different users concurrently while each user's updates run one
+    at a time in arrival order, so e.g. a hold tap can never race the draw that follows it.
+    max_queued_updates is PTB's global admission limit and a waiting update holds a slot, so
+    updates past the scheduler's per-user cap are dropped instead of queued.
+    """
+    def __init__(self, scheduler: KeyedScheduler, max_queued_updates: int = MAX_QUEUED_UPDATES):
+        super().__init__(max_queued_updates)
+        self.scheduler = scheduler
+        self.dropped = 0
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        try:
+            await self.scheduler.run(_update_key(update), coroutine)
+        except MailboxFull:
+            self.dropped += 1  # A user tapping faster than their updates can run
+
+    async def initialize(self) -> None:
+        self.scheduler.start()
+
+    async def shutdown(self) -> None:
+        await self.scheduler.stop()
+
+def _update_key(update: object) -> object:
+    """Mailbox key of an update: its user, else its chat. Anything else is not ordered."""
+    if isinstance(update, Update):
+        if update.effective_user:
+            return update.effective_user.id
+        if update.effective_chat:
+            return ('chat', update.effective_chat.id)
+    return ('update', id(update))
+
+update_scheduler = KeyedScheduler()
+
+# --- Game Config ---
+def _reload_config_now() -> None:
+    """SIGHUP handler: reloads the game config even if the file looks unchanged."""
+    task = asyncio.create_task(casino.config.reload(force=True))
+    _reload_tasks.add(task)
+    task.add_done_callback(_reload_finished)
+
+def _reload_finished(task: asyncio.Task) -> None:
+    _reload_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Failed to reload config: {task.exception()!r}")
+
+async def post_init(application: Application) -> None:
+    """Runs once the event loop is up."""
+    global _snapshot_task, _config_task
+    if PROFILING_ENABLED:
+        lag_monitor.start()
+    memory_tracker.start_tracing()
+    _snapshot_task = asyncio.create_task(_snapshot_loop())
+    _config_task = asyncio.create_task(casino.config.watch())
+    if hasattr(signal, 'SIGHUP'):  # Not available on Windows
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _reload_config_now)
+
+async def post_shutdown(application: Application) -> None:
+    """Runs after the bot has stopped polling, including on SIGTERM/SIGINT."""
+    lag_monitor.stop()
+    if _snapshot_task is not None:
+        _snapshot_task.cancel()
+    if _config_task is not None:
+        _config_task.cancel()
+    write_snapshot(_take_snapshot())
+
+def run(token: str) -> None:
+    """Builds the Telegram application and polls until stopped."""
+    casino.config.load()
+    restore_snapshot()
+
+    application = (
+        Application.builder()
+        .token(token)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .concurrent_updates(PerUserUpdateProcessor(update_scheduler))
+        .build()
+    )
+
+    application.add_handler(CommandHandler("start", track_handler(start)))
+    application.add_handler(CommandHandler("games", track_handler(games_menu)))
+    application.add_handler(CommandHandler("help", track_handler(help_command)))
+    application.add_handler(CommandHandler("roulette", track_handler(roulette)))
+    application.add_handler(CommandHandler("balance", track_handler(balance)))
+    application.add_handler(CommandHandler("blackjack", track_handler(blackjack_start)))
+    application.add_handler(CommandHandler("poker", track_handler(poker_start)))
+    application.add_handler(CommandHandler("stats", track_handler(stats_command)))
+    application.add_handler(CommandHandler("top", track_handler(top_command)))
+    application.add_handler(CommandHandler("profile", profile_command))
+    application.add_handler(CommandHandler("memory", memory_command))
+    application.add_handler(CallbackQueryHandler(track_handler(button_handler)))
+
+
+    application.add_error_handler(error_handler)
+
+    application.run_polling(allowed_updates=Update.ALL_TYPES)
@@ -0,0 +1,186 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+# --- Settings ---
+# tracemalloc slows every allocation down, so it is opt-in; the size accounting below only runs on demand
+MEMORY_TRACING = os.getenv('CASINO_TRACEMALLOC', '0') == '1'
+TRACEMALLOC_FRAMES = int(os.getenv('CASINO_TRACEMALLOC_FRAMES', '1'))
+SAMPLE_SIZE = 200  # Entries measured per collection; bigger collections are extrapolated from a random sample
+SAMPLE_DEPTH = 3   # Attribute levels searched for collections to sample inside service objects
+TOP_SITES = 10
+
+# Shared code and type objects, never part of a store's own footprint
+_SKIPPED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+class StoreSize(NamedTuple):
+    entries: Optional[int]  # None for objects that are not collections
+    bytes: int
+    estimated: bool  # True if bytes was extrapolated from a sample
+
+
+def deep_size(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Bytes held by obj and everything it references, counting shared objects once per seen set.
+    Follows containers, instance __dict__ and __slots__; skips classes, modules and functions.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, Mapping):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        if hasattr(current, '__dict__'):
+            stack.append(vars(current))
+        for cls in type(current).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def _sampled_size(obj: Any, seen: set, sample_size: int, depth: int) -> Tuple[int, bool]:
+    """
+    Deep size of obj, measuring collections larger than sample_size on a random sample and
+    looking up to depth levels into instance attributes for such collections.
+    Returns (bytes, estimated).
+    """
+    if isinstance(obj, Mapping) and len(obj) > sample_size:
+        keys = random.sample(list(obj), sample_size)
+        sampled = sum(deep_size(key, seen) + deep_size(obj[key], seen) for key in keys)
+        return sys.getsizeof(obj) + sampled * len(obj) // sample_size, True
+    if isinstance(obj, (list, tuple, set, frozenset, deque)) and len(obj) > sample_size:
+        sampled = sum(deep_size(item, seen) for item in random.sample(list(obj), sample_size))
+        return sys.getsizeof(obj) + sampled * len(obj) // sample_size, True
+    if hasattr(obj, 'memory_footprint'):  # Linked structures that estimate their own size (e.g. the leaderboard)
+        return obj.memory_footprint(sample_size), True
+    if depth and hasattr(obj, '__dict__') and not isinstance(obj, _SKIPPED_TYPES) and id(obj) not in seen:
+        seen.add(id(obj))
+        attributes = vars(obj)
+        total, estimated = sys.getsizeof(obj) + sys.getsizeof(attributes), False
+        for name, value in attributes.items():
+            size, value_estimated = _sampled_size(value, seen, sample_size, depth - 1)
+            total += deep_size(name, seen) + size
+            estimated = estimated or value_estimated
+        return total, estimated
+    return deep_size(obj, seen), False
+
+
+def measure_store(store: Any, sample_size: int = SAMPLE_SIZE) -> StoreSize:
+    """
+    Deep size of a store. Collections larger than sample_size, including the ones held by
+    service objects such as the stats or the bet guard, are measured on a random sample of
+    entries and extrapolated, so the cost stays bounded however many users there are.
+    """
+    entries = len(store) if hasattr(store, '__len__') else None
+    size, estimated = _sampled_size(store, set(), sample_size, SAMPLE_DEPTH)
+    return StoreSize(entries, size, estimated)
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryTracker:
+    """
+    Builds the admin memory report and remembers the previous one,
+    so each report also shows what grew since the last.
+    store_report() walks live objects and must run on the event loop; allocation_report()
+    only reads tracemalloc and can run in a thread.
+    """
+    def __init__(self):
+        self._last_sizes: Dict[str, int] = {}
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._last_time: Optional[float] = None
+
+    def start_tracing(self) -> None:
+        """Starts tracemalloc if enabled through CASINO_TRACEMALLOC."""
+        if MEMORY_TRACING and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def store_report(self, stores: Mapping[str, Any], counters: Optional[Mapping[str, int]] = None) -> str:
+        """
+        Plain-text report of the deep size of each store, the entry counts of caches that
+        can't be walked (counters) and the peak RSS.
+        """
+        now = time.time()
+        since = f" (changes since {now - self._last_time:.0f}s ago)" if self._last_time else ""
+        lines = [f"Stores{since}:"]
+        sizes = {}
+        for name, store in stores.items():
+            size = measure_store(store)
+            sizes[name] = size.bytes
+            approx = '~' if size.estimated else ''
+            growth = ''
+            if name in self._last_sizes:
+                growth = f", {'+' if size.bytes >= self._last_sizes[name] else '-'}{_format_bytes(abs(size.bytes - self._last_sizes[name]))}"
+            entries = f"{size.entries} entries, " if size.entries is not None else ""
+            lines.append(f"  {name}: {entries}{approx}{_format_bytes(size.bytes)}{growth}")
+        for name, count in (counters or {}).items():
+            lines.append(f"  {name}: {count} entries")
+
+        peak_rss = _peak_rss()
+        if peak_rss is not None:
+            lines.append(f"Peak RSS: {_format_bytes(peak_rss)}")
+        self._last_sizes = sizes
+        self._last_time = now
+        return '\n'.join(lines)
+
+    def allocation_report(self) -> str:
+        """Top allocation sites and their growth since the previous call, if tracemalloc is on."""
+        if not tracemalloc.is_tracing():
+            return "tracemalloc is off (set CASINO_TRACEMALLOC=1 for allocation sites)."
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Traced: {_format_bytes(current)} (peak {_format_bytes(peak)})", "Top allocation sites:"]
+        lines.extend(_format_sites(snapshot.statistics('lineno')[:TOP_SITES]))
+        if self._last_snapshot is not None:
+            growth = [stat for stat in snapshot.compare_to(self._last_snapshot, 'lineno') if stat.size_diff > 0]
+            lines.append("Top growth:")
+            lines.extend(_format_sites(growth[:TOP_SITES], diff=True))
+        self._last_snapshot = snapshot
+        return '\n'.join(lines)
+
+
+def _format_sites(stats: List[Any], diff: bool = False) -> List[str]:
+    lines = []
+    for stat in stats:
+        frame = stat.traceback[0]
+        size = f"+{_format_bytes(stat.size_diff)}" if diff else _format_bytes(stat.size)
+        lines.append(f"  {os.path.basename(frame.filename)}:{frame.lineno}: {size} in {stat.count} blocks")
+    return lines or ["  (none)"]
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident set size in bytes, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+
+
+memory_tracker = MemoryTracker()
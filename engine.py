@@ -0,0 +1,309 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from blackjack import BlackjackGame
+from game_config import ConfigStore, config_store
+from guard import BetGuard
+from poker import MULTI_HAND_COUNTS, MultiHandPokerGame, VideoPokerGame
+from roulette import BET_COVERAGE, ROULETTE_NUMBERS, determine_outcome, spin_wheel
+from stats import StatsService
+
+# --- Constants ---
+STARTING_BALANCE = 1000
+VALID_ROULETTE_BETS = tuple(BET_COVERAGE)  # Colors, 0-36, odd/even, high/low, dozens and columns
+BLACKJACK_ACTIONS = ('hit', 'stand', 'double', 'split', 'insurance', 'surrender')
+POKER_ACTIONS = ('hold', 'draw')
+
+# --- User-facing errors ---
+GAME_IN_PROGRESS = {
+    'blackjack': "Ya tienes un juego en progreso. ¡Por favor, termínalo antes de comenzar uno nuevo!",
+    'poker': "Ya tienes un juego de Video Poker en progreso. ¡Termínalo primero!",
+}
+GAME_EXPIRED = {
+    'blackjack': "Esta partida ha expirado o no se ha encontrado. Por favor, inicia una nueva.",
+    'poker': "Esta partida ha expirado. Por favor, inicia una nueva.",
+}
+INVALID_BET_TYPE = "Tipo de apuesta inválido."
+INVALID_HAND_COUNT = "Número de manos inválido. Puedes jugar 1, 3 o 10 manos."
+ACTION_UNAVAILABLE = "Esa jugada no está disponible ahora."
+UNKNOWN_GAME = "Ese juego no existe."
+
+
+@dataclass
+class GameResult:
+    """
+    Outcome of a service call, independent of any front end.
+    When error is set the request was refused and nothing changed.
+    """
+    game: str
+    error: Optional[str] = None
+    state: Any = None       # The game object after the call (None for roulette)
+    action: Optional[str] = None
+    finished: bool = False  # True once the round was settled
+    payout: int = 0         # Net wallet change of the settled round
+    balance: int = 0        # Balance after the call
+    details: Dict[str, Any] = field(default_factory=dict)  # Game-specific outcome (winning number, hand results...)
+
+
+class CasinoService:
+    """
+    Transport-neutral casino: wallets, open games, bet guard and stats.
+    Front ends (the Telegram bot, simulations, tests) call place_bet/act/get_state
+    and render the returned GameResult however they like.
+    New rounds use the rules current in the config store when they start.
+    """
+    def __init__(self, guard: Optional[BetGuard] = None, stats: Optional[StatsService] = None,
+                 config: Optional[ConfigStore] = None):
+        self.balances: Dict[int, int] = {}                      # {user_id: balance}
+        self.blackjack_games: Dict[int, BlackjackGame] = {}     # {user_id: BlackjackGame}
+        self.poker_games: Dict[int, VideoPokerGame] = {}        # {user_id: VideoPokerGame}
+        self.guard = guard or BetGuard()
+        self.stats = stats or StatsService()
+        self.config = config or config_store
+        self.balance_listeners: List[Callable[[int], None]] = []  # Called with the user_id after every wallet change
+        self.game_listeners: List[Callable[[int, str], None]] = []  # Called with (user_id, game) when an open game changes
+
+    # --- Wallet ---
+    def open_account(self, user_id: int) -> bool:
+        """Creates an account with the starting balance. Returns False if it already existed."""
+        if user_id in self.balances:
+            return False
+        self.balances[user_id] = STARTING_BALANCE
+        self.stats.leaderboard.update(user_id, STARTING_BALANCE)  # Ranked from the start, not after their first round
+        self._notify(user_id)
+        return True
+
+    def get_balance(self, user_id: int) -> int:
+        return self.balances.get(user_id, 0)
+
+    def settle(self, user_id: int, game: str, payout: int) -> int:
+        """Applies a settled round to the wallet, feeds the guard and stats, and returns the new balance."""
+        self.balances[user_id] += payout
+        new_balance = self.balances[user_id]
+        self.guard.record_settlement(user_id, payout)
+        self.stats.record(user_id, game, payout, new_balance)
+        self._notify(user_id)
+        return new_balance
+
+    def _notify(self, user_id: int) -> None:
+        for listener in self.balance_listeners:
+            listener(user_id)
+
+    def _notify_game(self, user_id: int, game: str) -> None:
+        for listener in self.game_listeners:
+            listener(user_id, game)
+
+    def restore(self, balances: Dict[int, int], blackjack_games: Dict[int, BlackjackGame],
+                poker_games: Dict[int, VideoPokerGame]) -> None:
+        """Loads previously saved stores (see snapshots.py)."""
+        # Snapshots don't store the rules, so restored games continue under the current config
+        rules = self.config.current
+        for blackjack_game in blackjack_games.values():
+            blackjack_game.blackjack_payout = rules.blackjack_payout
+        for poker_game in poker_games.values():
+            poker_game.paytable = rules.poker_paytable
+        self.balances.update(balances)
+        self.blackjack_games.update(blackjack_games)
+        self.poker_games.update(poker_games)
+        for user_id, balance in balances.items():
+            self.stats.leaderboard.update(user_id, balance)
+            self._notify(user_id)
+        for user_id in blackjack_games:
+            self._notify_game(user_id, 'blackjack')
+        for user_id in poker_games:
+            self._notify_game(user_id, 'poker')
+
+    # --- Queries ---
+    def has_game(self, user_id: int, game: str) -> bool:
+        return user_id in self._games(game)
+
+    def get_state(self, user_id: int) -> Dict[str, Any]:
+        """Balance and open games of a user."""
+        return {
+            'balance': self.get_balance(user_id),
+            'blackjack': self.blackjack_games.get(user_id),
+            'poker': self.poker_games.get(user_id),
+        }
+
+    def open_stake(self, user_id: int) -> int:
+        """Money the user has at stake in open games, not yet settled."""
+        stake = 0
+        blackjack_game = self.blackjack_games.get(user_id)
+        if blackjack_game is not None:
+            stake += blackjack_game.total_wagered()
+        poker_game = self.poker_games.get(user_id)
+        if poker_game is not None:
+            stake += poker_game.total_bet
+        return stake
+
+    def blackjack_options(self, user_id: int, game: BlackjackGame) -> Dict[str, bool]:
+        """Optional moves the rules allow and the user's balance can cover, after every open stake."""
+        available = self.get_balance(user_id) - self.open_stake(user_id)
+        current_bet = game.hand_bets[game.active_hand]
+        return {
+            'double': game.can_double() and available >= current_bet,
+            'split': game.can_split() and available >= current_bet,
+            'insurance': game.can_insure() and 0 < game.bet_amount // 2 <= available,
+            'surrender': game.can_surrender(),
+        }
+
+    def _games(self, game: str) -> Dict[int, Any]:
+        """Open games of a game that keeps state between moves; empty for any other name."""
+        if game == 'blackjack':
+            return self.blackjack_games
+        if game == 'poker':
+            return self.poker_games
+        return {}
+
+    # --- Betting ---
+    async def place_bet(self, user_id: int, game: str, bet_amount: int,
+                        bet_type: Optional[str] = None, num_hands: int = 1) -> GameResult:
+        """
+        Starts a round. Roulette settles immediately; blackjack and poker open a game
+        (a natural blackjack is settled right away).
+        """
+        if game == 'roulette':
+            return self._spin_roulette(user_id, bet_amount, bet_type)
+        if game not in GAME_IN_PROGRESS:
+            raise ValueError(f"Unknown game: {game}")
+
+        if self.has_game(user_id, game):
+            return self._refuse(user_id, game, GAME_IN_PROGRESS[game])
+        if game == 'poker' and num_hands != 1 and num_hands not in MULTI_HAND_COUNTS:
+            return self._refuse(user_id, game, INVALID_HAND_COUNT)
+        exposure = bet_amount * num_hands if game == 'poker' else bet_amount
+        error = self.guard.check(user_id, game, bet_amount, self.balances.get(user_id), exposure,
+                                 self.open_stake(user_id))
+        if error:
+            return self._refuse(user_id, game, error)
+
+        rules = self.config.current
+        if game == 'poker':
+            if num_hands > 1:
+                poker_game = MultiHandPokerGame(bet_amount, num_hands, rules.poker_paytable)
+            else:
+                poker_game = VideoPokerGame(bet_amount, rules.poker_paytable)
+            poker_game.start_game()
+            self.poker_games[user_id] = poker_game
+            self._notify_game(user_id, 'poker')
+            return GameResult('poker', state=poker_game, action='bet', balance=self.get_balance(user_id))
+
+        blackjack_game = BlackjackGame(bet_amount, rules.blackjack_payout)
+        blackjack_game.start_game()
+        self.blackjack_games[user_id] = blackjack_game
+        self._notify_game(user_id, 'blackjack')
+        if blackjack_game.player_hand.value == 21:  # Natural blackjack
+            result = self._finish_blackjack(user_id, blackjack_game, 'bet')
+            result.details['natural'] = True
+            return result
+        return GameResult('blackjack', state=blackjack_game, action='bet', balance=self.get_balance(user_id))
+
+    def _spin_roulette(self, user_id: int, bet_amount: int, bet_type: Optional[str]) -> GameResult:
+        bet_type = (bet_type or '').lower()
+        if bet_type not in VALID_ROULETTE_BETS:
+            return self._refuse(user_id, 'roulette', INVALID_BET_TYPE)
+        error = self.guard.check(user_id, 'roulette', bet_amount, self.balances.get(user_id),
+                                 open_stake=self.open_stake(user_id))
+        if error:
+            return self._refuse(user_id, 'roulette', error)
+
+        winning_number = spin_wheel()
+        payout = determine_outcome(winning_number, bet_amount, bet_type, self.config.current.roulette_payouts)
+        new_balance = self.settle(user_id, 'roulette', payout)
+        return GameResult(
+            'roulette', action='spin', finished=True, payout=payout, balance=new_balance,
+            details={'winning_number': winning_number, 'color': ROULETTE_NUMBERS[winning_number], 'bet_type': bet_type},
+        )
+
+    def _refuse(self, user_id: int, game: str, error: str, state: Any = None) -> GameResult:
+        return GameResult(game, error=error, state=state, balance=self.get_balance(user_id))
+
+    # --- Game actions ---
+    async def act(self, user_id: int, game: str, action: str, index: Optional[int] = None) -> GameResult:
+        """
+        Plays a move in an open game. Blackjack actions: BLACKJACK_ACTIONS;
+        poker actions: 'hold' (with the card index) and 'draw'.
+        """
+        if game not in GAME_EXPIRED:  # Roulette has no moves and anything else is not a game
+            return self._refuse(user_id, game, UNKNOWN_GAME)
+        current = self._games(game).get(user_id)
+        if current is None:
+            return self._refuse(user_id, game, GAME_EXPIRED[game])
+        if game == 'poker':
+            result = self._act_poker(user_id, current, action, index)
+        else:
+            result = self._act_blackjack(user_id, current, action)
+        if not result.error:
+            self._notify_game(user_id, game)
+        return result
+
+    def _act_poker(self, user_id: int, game: VideoPokerGame, action: str, index: Optional[int]) -> GameResult:
+        if action == 'hold':
+            if index is None or not 0 <= index < 5:
+                return self._refuse(user_id, 'poker', ACTION_UNAVAILABLE, game)
+            game.toggle_hold(index)
+            return GameResult('poker', state=game, action='hold', balance=self.get_balance(user_id))
+        if action != 'draw':
+            return self._refuse(user_id, 'poker', ACTION_UNAVAILABLE, game)
+
+        game.draw()
+        if isinstance(game, MultiHandPokerGame):
+            # All hands are settled together in a single wallet update
+            payout = game.total_payout()
+            details = {'results': list(game.results)}
+        else:
+            hand_name, payout = game.evaluate_hand()
+            details = {'hand_name': hand_name}
+        del self.poker_games[user_id]
+        new_balance = self.settle(user_id, 'poker', payout)
+        return GameResult('poker', state=game, action='draw', finished=True, payout=payout, balance=new_balance, details=details)
+
+    def _act_blackjack(self, user_id: int, game: BlackjackGame, action: str) -> GameResult:
+        options = self.blackjack_options(user_id, game)
+        details: Dict[str, Any] = {}
+        raise_amount = self._raise_amount(game, action)
+        if raise_amount and options[action]:
+            error = self.guard.check_raise(user_id, self.open_stake(user_id) + raise_amount)
+            if error:
+                return self._refuse(user_id, 'blackjack', error, game)
+        if action == 'hit':
+            details['busted'] = game.player_hits()
+        elif action == 'stand':
+            details['stood_value'] = game.player_hand.value
+            game.player_stands()
+        elif action == 'double' and options['double']:
+            game.player_doubles()
+        elif action == 'split' and options['split']:
+            game.player_splits()
+        elif action == 'insurance' and options['insurance']:
+            game.player_insures()
+        elif action == 'surrender' and options['surrender']:
+            game.player_surrenders()
+        else:  # Stale button or a move that is no longer allowed
+            return self._refuse(user_id, 'blackjack', ACTION_UNAVAILABLE, game)
+
+        if game.is_player_done:
+            result = self._finish_blackjack(user_id, game, action)
+            result.details.update(details)
+            return result
+        return GameResult('blackjack', state=game, action=action, balance=self.get_balance(user_id), details=details)
+
+    @staticmethod
+    def _raise_amount(game: BlackjackGame, action: str) -> int:
+        """Extra money a blackjack move puts at stake."""
+        if action in ('double', 'split'):
+            return game.hand_bets[game.active_hand]
+        if action == 'insurance':
+            return game.bet_amount // 2
+        return 0
+
+    def _finish_blackjack(self, user_id: int, game: BlackjackGame, action: str) -> GameResult:
+        """Settles every hand and the insurance in one wallet update and closes the game."""
+        results, insurance_payout = game.settle()
+        payout = sum(hand_payout for _, hand_payout in results) + insurance_payout
+        del self.blackjack_games[user_id]
+        new_balance = self.settle(user_id, 'blackjack', payout)
+        return GameResult(
+            'blackjack', state=game, action=action, finished=True, payout=payout, balance=new_balance,
+            details={'results': results, 'insurance_payout': insurance_payout},
+        )
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+from blackjack import BLACKJACK_PAYOUT
+from poker import PAYOUT_TABLE
+from roulette import ROULETTE_PAYOUTS, compile_payout_table
+
+# --- Settings ---
+CONFIG_PATH = os.getenv('CASINO_CONFIG_PATH', 'casino_config.json')
+CONFIG_POLL_INTERVAL = float(os.getenv('CASINO_CONFIG_POLL_INTERVAL', '5'))  # Seconds between file checks
+DEFAULT_BET_AMOUNTS = (10, 50, 100, 250)
+MAX_BET_BUTTONS = 8
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    """Compiled, read-only game rules. Every reload builds a new object instead of mutating this one."""
+    poker_paytable: Mapping[str, int]                  # {hand name: payout multiplier}
+    roulette_payouts: Mapping[str, Tuple[int, ...]]    # {bet type: multiplier per winning number}, see roulette.py
+    blackjack_payout: float                            # Payout of a natural blackjack
+    bet_amounts: Tuple[int, ...]                       # Amounts offered on the bet buttons
+
+
+def _int_table(raw: Any, defaults: Mapping[str, int], section: str) -> dict:
+    """Overlays a {name: int} section on its defaults, rejecting unknown names and non-integers."""
+    if not isinstance(raw, dict):
+        raise ValueError(f"'{section}' must be an object")
+    unknown = set(raw) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown entries in '{section}': {', '.join(sorted(unknown))}")
+    table = {**defaults, **raw}
+    for name, value in table.items():
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"'{section}.{name}' must be an integer")
+    return table
+
+
+def compile_config(raw: Mapping[str, Any]) -> GameConfig:
+    """
+    Validates a parsed config file and builds its lookup structures.
+    Missing keys keep their defaults. Raises ValueError if the config is invalid.
+    """
+    unknown = set(raw) - {'poker_paytable', 'roulette_payouts', 'blackjack_payout', 'bet_amounts'}
+    if unknown:
+        raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+
+    paytable = _int_table(raw.get('poker_paytable', {}), PAYOUT_TABLE, 'poker_paytable')
+    roulette_payouts = _int_table(raw.get('roulette_payouts', {}), ROULETTE_PAYOUTS, 'roulette_payouts')
+    if any(value < 1 for value in roulette_payouts.values()):
+        raise ValueError("Roulette payouts must be at least 1")
+
+    blackjack_payout = raw.get('blackjack_payout', BLACKJACK_PAYOUT)
+    if not isinstance(blackjack_payout, (int, float)) or isinstance(blackjack_payout, bool) or blackjack_payout <= 0:
+        raise ValueError("'blackjack_payout' must be a positive number")
+
+    bet_amounts = raw.get('bet_amounts', DEFAULT_BET_AMOUNTS)
+    if (not isinstance(bet_amounts, (list, tuple)) or not 1 <= len(bet_amounts) <= MAX_BET_BUTTONS
+            or not all(isinstance(amount, int) and not isinstance(amount, bool) and amount > 0 for amount in bet_amounts)):
+        raise ValueError(f"'bet_amounts' must be a list of 1 to {MAX_BET_BUTTONS} positive integers")
+
+    return GameConfig(
+        poker_paytable=MappingProxyType(paytable),
+        roulette_payouts=compile_payout_table(roulette_payouts),
+        blackjack_payout=float(blackjack_payout),
+        bet_amounts=tuple(bet_amounts),
+    )
+
+
+DEFAULT_CONFIG = compile_config({})
+
+
+class ConfigStore:
+    """
+    Holds the current GameConfig and replaces it when the file changes or on demand (SIGHUP).
+    Reading and compiling happen off the event loop; the swap is a single reference assignment.
+    Games copy the rules they need when they start, so a reload never changes a game in progress.
+    """
+    def __init__(self, path: str = CONFIG_PATH):
+        self.path = path
+        self.current = DEFAULT_CONFIG
+        self._stamp: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of the file last read
+
+    def read_if_changed(self, force: bool = False) -> Optional[GameConfig]:
+        """
+        Reads and compiles the file if it changed since the last read (or force is set).
+        Returns the new config, or None if there is nothing new. Blocking.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp and not force:
+            return None
+        self._stamp = stamp  # Set first so a broken file is reported once, not on every poll
+        with open(self.path, encoding='utf-8') as f:
+            return compile_config(json.load(f))
+
+    def load(self) -> None:
+        """Initial synchronous load at startup. An invalid file raises."""
+        config = self.read_if_changed(force=True)
+        if config is not None:
+            self.current = config
+
+    async def reload(self, force: bool = False) -> bool:
+        """Reloads the file if it changed. An invalid file keeps the current config. Returns True if swapped."""
+        try:
+            config = await asyncio.to_thread(self.read_if_changed, force)
+        except (OSError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+            print(f"Failed to reload config {self.path}: {e}")
+            return False
+        if config is None:
+            return False
+        self.current = config
+        print(f"Reloaded game config from {self.path}.")
+        return True
+
+    async def watch(self, interval: float = CONFIG_POLL_INTERVAL) -> None:
+        """Polls the file for changes until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload()
+
+
+config_store = ConfigStore()
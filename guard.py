@@ -0,0 +1,135 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+# --- Default Limits ---
+# (min, max) bet per game; for multi-hand poker the limits apply per hand
+DEFAULT_GAME_LIMITS = {
+    'roulette': (1, 1000),
+    'blackjack': (1, 1000),
+    'poker': (1, 500),
+}
+BETS_PER_MINUTE = int(os.getenv('CASINO_BETS_PER_MINUTE', '30'))
+DAILY_LOSS_LIMIT = int(os.getenv('CASINO_DAILY_LOSS_LIMIT', '5000'))  # 0 disables the loss limit
+
+RATE_LIMIT_MESSAGE = "Estás apostando demasiado rápido. Espera un momento antes de volver a apostar. ⏳"
+
+
+# --- Sliding Window Counter ---
+class SlidingWindowCounter:
+    """
+    Approximate per-key sliding-window counter.
+    Keeps only the current and previous fixed windows per key and weights the previous
+    one by how much of it still overlaps the sliding window, so every check is O(1).
+    """
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._counters: Dict[int, List[float]] = {}  # {key: [window_index, current_count, previous_count]}
+
+    def estimate(self, key: int, now: float) -> float:
+        """Estimated number of hits for key within the last window_seconds."""
+        counter = self._roll(key, now)
+        elapsed_fraction = (now % self.window) / self.window
+        return counter[2] * (1 - elapsed_fraction) + counter[1]
+
+    def add(self, key: int, now: float) -> None:
+        self._roll(key, now)[1] += 1
+
+    def _roll(self, key: int, now: float) -> List[float]:
+        """Returns the key's counter, shifted forward to the window containing now."""
+        window_index = int(now // self.window)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = [window_index, 0, 0]
+        elif counter[0] != window_index:
+            # The previous window only carries over if it is the one right before this one
+            counter[2] = counter[1] if counter[0] == window_index - 1 else 0
+            counter[1] = 0
+            counter[0] = window_index
+        return counter
+
+
+# --- Bet Guard ---
+class BetGuard:
+    """
+    In-memory pre-check in front of the wallet: bet limits, bet rate and daily loss limit.
+    check() is cheap enough to run on every tap before any game object is created.
+    """
+    def __init__(self, game_limits: Dict[str, Tuple[int, int]] = DEFAULT_GAME_LIMITS,
+                 bets_per_minute: int = BETS_PER_MINUTE, daily_loss_limit: int = DAILY_LOSS_LIMIT):
+        self.game_limits = dict(game_limits)
+        self.bets_per_minute = bets_per_minute
+        self.daily_loss_limit = daily_loss_limit
+        self.user_limits: Dict[Tuple[int, str], Tuple[int, int]] = {}  # {(user_id, game): (min, max)} overrides
+        self._bet_rate = SlidingWindowCounter(60)
+        self._daily_net: Dict[int, List[int]] = {}  # {user_id: [day, net result so far today]}
+
+    def set_user_limits(self, user_id: int, game: str, min_bet: int, max_bet: int) -> None:
+        """Overrides the game limits for one user (e.g. a self-imposed maximum)."""
+        self.user_limits[(user_id, game)] = (min_bet, max_bet)
+
+    def limits_for(self, user_id: int, game: str) -> Tuple[int, int]:
+        return self.user_limits.get((user_id, game)) or self.game_limits[game]
+
+    def check(self, user_id: int, game: str, bet_amount: int, balance: Optional[int],
+              exposure: Optional[int] = None, open_stake: int = 0, now: Optional[float] = None) -> Optional[str]:
+        """
+        Validates a new bet. exposure is the total at stake when it differs from bet_amount
+        (e.g. multi-hand poker); open_stake is what the user already has at stake in other
+        open games, which is neither available for betting nor settled yet.
+        Returns a message for the user, or None if the bet may go ahead.
+        The bet is counted towards the rate limit only when it is accepted.
+        """
+        now = time.time() if now is None else now
+        if self._bet_rate.estimate(user_id, now) >= self.bets_per_minute:
+            return RATE_LIMIT_MESSAGE
+
+        if bet_amount <= 0:
+            return "La cantidad de la apuesta debe ser positiva."
+        min_bet, max_bet = self.limits_for(user_id, game)
+        if bet_amount < min_bet:
+            return f"La apuesta mínima es {min_bet}."
+        if bet_amount > max_bet:
+            return f"La apuesta máxima es {max_bet}."
+
+        exposure = bet_amount if exposure is None else exposure
+        if balance is None or balance - open_stake < exposure:
+            in_play = f" ({open_stake} en juego)" if open_stake else ""
+            return f"¡No tienes saldo suficiente! Tu saldo es: {balance or 0}{in_play}"
+
+        error = self._check_daily_loss(user_id, open_stake + exposure, now)
+        if error:
+            return error
+
+        self._bet_rate.add(user_id, now)
+        return None
+
+    def check_raise(self, user_id: int, exposure: int, now: Optional[float] = None) -> Optional[str]:
+        """
+        Validates extra money put on a round already in play (double down, split, insurance).
+        exposure is everything the user has at stake in open games, including the raise.
+        Only the daily loss limit applies: table limits and the bet rate are about starting rounds.
+        """
+        return self._check_daily_loss(user_id, exposure, time.time() if now is None else now)
+
+    def _check_daily_loss(self, user_id: int, exposure: int, now: float) -> Optional[str]:
+        """Refuses if losing all of exposure would take the user past today's loss limit."""
+        if self.daily_loss_limit:
+            lost_today = -self._today(user_id, now)[1]
+            if lost_today + exposure > self.daily_loss_limit:
+                return (
+                    f"Has alcanzado tu límite de pérdidas diario ({self.daily_loss_limit}). "
+                    "Vuelve mañana. Juega con responsabilidad. 💙"
+                )
+        return None
+
+    def record_settlement(self, user_id: int, payout: int, now: Optional[float] = None) -> None:
+        """Feeds a settled result into the daily loss counter."""
+        self._today(user_id, time.time() if now is None else now)[1] += payout
+
+    def _today(self, user_id: int, now: float) -> List[int]:
+        day = int(now // 86400)
+        entry = self._daily_net.get(user_id)
+        if entry is None or entry[0] != day:
+            entry = self._daily_net[user_id] = [day, 0]
+        return entry
@@ -0,0 +1,296 @@
+"""
+Exact house-edge analyzer for roulette bets and the Jacks or Better paytable.
+
+Roulette: expected return and variance of every bet type, computed from determine_outcome
+over the 37 equally likely numbers.
+
+Jacks or Better: every starting hand (2,598,960, reduced to 134,459 suit-isomorphic classes)
+is played with the best of its 32 hold patterns, counting every possible draw exactly.
+The per-subset hand counts behind that are independent of the paytable and are cached
+once; per-paytable results are checkpointed in chunks under a directory named after the
+paytable's hash, so an interrupted run resumes and a changed paytable only redoes the
+cheap part.
+
+Usage: python house_edge.py [roulette|poker|all] [--config PATH] [--workers N] [--cache-dir DIR]
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from game_config import DEFAULT_CONFIG, GameConfig, compile_config
+from poker import PAYOUT_TABLE, _name_from_ranks
+from roulette import BET_COVERAGE, determine_outcome
+
+CACHE_DIR = os.getenv('CASINO_HOUSE_EDGE_CACHE', 'house_edge_cache')
+CHUNK_SIZE = 5000  # Starting-hand classes per checkpoint
+
+CATEGORIES = tuple(PAYOUT_TABLE)  # Final-hand categories, in paytable order
+_CATEGORY_INDEX = {name: index for index, name in enumerate(CATEGORIES)}
+TOTAL_HANDS = comb(52, 5)
+# Subsets of up to 4 positions of a 5-card hand
+_PROPER_SUBSETS = [positions for size in range(5) for positions in itertools.combinations(range(5), size)]
+
+
+# --- Roulette ---
+def roulette_report(config: GameConfig) -> List[Tuple[str, float, float]]:
+    """(bet type, expected return per unit bet, variance) for every bet type."""
+    rows = []
+    for bet_type in BET_COVERAGE:
+        outcomes = [determine_outcome(number, 1, bet_type, config.roulette_payouts) for number in range(37)]
+        mean = sum(outcomes) / 37
+        rows.append((bet_type, mean, sum(outcome * outcome for outcome in outcomes) / 37 - mean * mean))
+    return rows
+
+
+# --- Jacks or Better: paytable-independent counts ---
+# Cards are indexed rank * 4 + suit, with ranks in the order of blackjack.RANKS
+def _category(cards: Sequence[int]) -> int:
+    rank_counts = [0] * 13
+    for card in cards:
+        rank_counts[card >> 2] += 1
+    is_flush = len({card & 3 for card in cards}) == 1
+    return _CATEGORY_INDEX[_name_from_ranks(rank_counts, is_flush)]
+
+
+def _count_subsets(first_cards: Sequence[int]):
+    """
+    For every hand whose lowest card is in first_cards: adds its category to every proper
+    subset of it (keyed by card bitmask), and groups it into its suit-isomorphism class.
+    Returns ({subset mask: category counts}, {class key: [hand count, representative hand]}).
+    """
+    subset_counts = defaultdict(lambda: [0] * len(CATEGORIES))
+    classes: Dict[tuple, list] = {}
+    category_cache: Dict[tuple, int] = {}
+    for a in first_cards:
+        for b, c, d, e in itertools.combinations(range(a + 1, 52), 4):
+            hand = (a, b, c, d, e)
+            rank_counts = [0] * 13
+            by_suit: Tuple[list, ...] = ([], [], [], [])
+            for card in hand:
+                rank_counts[card >> 2] += 1
+                by_suit[card & 3].append(card >> 2)
+            is_flush = (a & 3) == (b & 3) == (c & 3) == (d & 3) == (e & 3)
+            cache_key = (tuple(rank_counts), is_flush)
+            category = category_cache.get(cache_key)
+            if category is None:
+                category = category_cache[cache_key] = _CATEGORY_INDEX[_name_from_ranks(rank_counts, is_flush)]
+
+            bits = [1 << card for card in hand]
+            for positions in _PROPER_SUBSETS:
+                mask = 0
+                for position in positions:
+                    mask |= bits[position]
+                subset_counts[mask][category] += 1
+
+            class_key = tuple(sorted(tuple(ranks) for ranks in by_suit))
+            entry = classes.get(class_key)
+            if entry is None:
+                classes[class_key] = [1, hand]
+            else:
+                entry[0] += 1
+    return dict(subset_counts), classes
+
+
+def _atomic_pickle(obj, path: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def build_subset_table(cache_dir: str, workers: int) -> str:
+    """
+    Builds (or reuses) the paytable-independent table: category counts of all 5-card hands
+    containing each subset of up to 4 cards, plus the starting-hand classes. Returns its path.
+    """
+    path = os.path.join(cache_dir, 'subset_counts.pkl')
+    if os.path.exists(path):
+        return path
+
+    print("Counting all 2,598,960 hands (once per cache directory)...", flush=True)
+    # Round-robin first cards so every task gets a similar number of hands
+    partitions = [list(range(worker, 48, workers)) for worker in range(workers)]
+    subset_counts: Dict[int, list] = {}
+    classes: Dict[tuple, list] = {}
+    with ProcessPoolExecutor(workers) as pool:
+        for partial_counts, partial_classes in pool.map(_count_subsets, partitions):
+            for mask, counts in partial_counts.items():
+                total = subset_counts.get(mask)
+                if total is None:
+                    subset_counts[mask] = counts
+                else:
+                    for category, count in enumerate(counts):
+                        total[category] += count
+            for class_key, (count, hand) in partial_classes.items():
+                entry = classes.get(class_key)
+                if entry is None:
+                    classes[class_key] = [count, hand]
+                else:
+                    entry[0] += count
+
+    # Sorted so that chunk numbers mean the same hands in every run
+    starting_hands = [(hand, count) for _, (count, hand) in sorted(classes.items())]
+    _atomic_pickle({'subset_counts': subset_counts, 'starting_hands': starting_hands}, path)
+    return path
+
+
+# --- Jacks or Better: per-paytable evaluation ---
+_subset_counts: Dict[int, list] = {}  # Loaded once per worker process
+
+
+def _load_subset_counts(path: str) -> None:
+    global _subset_counts
+    with open(path, 'rb') as f:
+        _subset_counts = pickle.load(f)['subset_counts']
+
+
+def best_hold(hand: Sequence[int], paytable: Sequence[int]) -> Tuple[int, float, List[int]]:
+    """
+    Returns (hold mask, expected payout, final category counts) of the best hold for a hand.
+    Bit i of the hold mask keeps hand[i].
+    """
+    num_categories = len(paytable)
+    # f[S]: category counts of all 5-card hands containing the cards in S
+    table = []
+    for mask in range(32):
+        if mask == 31:
+            counts = [0] * num_categories
+            counts[_category(hand)] = 1
+        else:
+            card_mask = 0
+            for position in range(5):
+                if mask >> position & 1:
+                    card_mask |= 1 << hand[position]
+            counts = list(_subset_counts[card_mask])
+        table.append(counts)
+    # Superset Moebius transform: table[H] becomes the draws that keep H and none of the other dealt cards
+    for position in range(5):
+        bit = 1 << position
+        for mask in range(32):
+            if not mask & bit:
+                counts, wider = table[mask], table[mask | bit]
+                for category in range(num_categories):
+                    counts[category] -= wider[category]
+
+    best = (0, float('-inf'), table[0])
+    for mask, counts in enumerate(table):
+        draws = comb(47, 5 - bin(mask).count('1'))
+        expected = sum(count * pay for count, pay in zip(counts, paytable)) / draws
+        if expected > best[1]:
+            best = (mask, expected, counts)
+    return best
+
+
+def _evaluate_chunk(args) -> Tuple[List[float], List[int]]:
+    """
+    Plays a chunk of starting-hand classes optimally.
+    Returns (probability mass per final category, hand count per number of cards held).
+    """
+    starting_hands, paytable = args
+    category_mass = [0.0] * len(paytable)
+    held_histogram = [0] * 6
+    for hand, weight in starting_hands:
+        mask, _, counts = best_hold(hand, paytable)
+        held = bin(mask).count('1')
+        draws = comb(47, 5 - held)
+        for category, count in enumerate(counts):
+            category_mass[category] += weight * count / draws / TOTAL_HANDS
+        held_histogram[held] += weight
+    return category_mass, held_histogram
+
+
+def paytable_hash(paytable: Mapping[str, int]) -> str:
+    payload = json.dumps([[name, paytable[name]] for name in CATEGORIES])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def poker_report(config: GameConfig, cache_dir: str, workers: int, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Optimal-strategy return, variance and final-hand frequencies for the configured paytable."""
+    paytable = [config.poker_paytable[name] for name in CATEGORIES]
+    run_dir = os.path.join(cache_dir, 'jacks_or_better', paytable_hash(config.poker_paytable))
+    result_path = os.path.join(run_dir, 'result.json')
+    if os.path.exists(result_path):
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+    os.makedirs(run_dir, exist_ok=True)
+
+    table_path = build_subset_table(cache_dir, workers)
+    with open(table_path, 'rb') as f:
+        starting_hands = pickle.load(f)['starting_hands']
+    chunks = [starting_hands[start:start + chunk_size] for start in range(0, len(starting_hands), chunk_size)]
+    chunk_paths = [os.path.join(run_dir, f'chunk_{index:04d}.pkl') for index in range(len(chunks))]
+    pending = [index for index, path in enumerate(chunk_paths) if not os.path.exists(path)]
+    if pending:
+        print(f"Evaluating {len(pending)} of {len(chunks)} chunks "
+              f"({len(starting_hands)} starting-hand classes x 32 holds)...", flush=True)
+        with ProcessPoolExecutor(workers, initializer=_load_subset_counts, initargs=(table_path,)) as pool:
+            results = pool.map(_evaluate_chunk, [(chunks[index], paytable) for index in pending])
+            for done, (index, result) in enumerate(zip(pending, results), 1):
+                _atomic_pickle(result, chunk_paths[index])  # Checkpoint: a rerun skips this chunk
+                print(f"  chunk {index} done ({done}/{len(pending)})", flush=True)
+
+    category_mass = [0.0] * len(CATEGORIES)
+    held_histogram = [0] * 6
+    for path in chunk_paths:
+        with open(path, 'rb') as f:
+            chunk_mass, chunk_histogram = pickle.load(f)
+        category_mass = [total + mass for total, mass in zip(category_mass, chunk_mass)]
+        held_histogram = [total + count for total, count in zip(held_histogram, chunk_histogram)]
+
+    expected = sum(mass * pay for mass, pay in zip(category_mass, paytable))
+    result = {
+        'paytable': {name: config.poker_paytable[name] for name in CATEGORIES},
+        'expected_return': expected,
+        'variance': sum(mass * pay * pay for mass, pay in zip(category_mass, paytable)) - expected * expected,
+        'frequencies': dict(zip(CATEGORIES, category_mass)),
+        'cards_held': held_histogram,
+    }
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+# --- Command line ---
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('game', nargs='?', choices=('roulette', 'poker', 'all'), default='all')
+    parser.add_argument('--config', help='Game config file to analyze (default: the built-in rules)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Where counts and checkpoints are kept')
+    args = parser.parse_args()
+
+    config = DEFAULT_CONFIG
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config = compile_config(json.load(f))
+    os.makedirs(args.cache_dir, exist_ok=True)
+
+    if args.game in ('roulette', 'all'):
+        print(f"{'bet':<8} {'return':>9} {'edge %':>8} {'std dev':>8}")
+        for bet_type, mean, variance in roulette_report(config):
+            print(f"{bet_type:<8} {mean:>+9.5f} {-mean * 100:>8.3f} {variance ** 0.5:>8.3f}")
+        print()
+
+    if args.game in ('poker', 'all'):
+        start = time.perf_counter()
+        result = poker_report(config, args.cache_dir, max(1, args.workers))
+        print("Jacks or Better, optimal play (payouts are net wins per unit bet):")
+        for name, frequency in result['frequencies'].items():
+            print(f"  {name:<16} {result['paytable'][name]:>5} {frequency:>10.6%}")
+        print(f"  expected return {result['expected_return']:+.6f} per unit "
+              f"(house edge {-result['expected_return']:.4%}), std dev {result['variance'] ** 0.5:.4f}")
+        print(f"  ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
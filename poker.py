@@ -1,5 +1,5 @@
-from collections import Counter
-from typing import List, Tuple
+import random
+from typing import List, Mapping, Optional, Tuple
 
 # Re-using the card logic from blackjack
 from blackjack import Card, Deck, RANKS
@@ -18,17 +18,60 @@ PAYOUT_TABLE = {
     "Nothing": -1,  # Represents a loss of the original bet
 }
 
+# Hand sizes offered by the multi-hand mode (Triple Play / Ten Play)
+MULTI_HAND_COUNTS = (3, 10)
+
+_RANK_INDEX = {rank: index for index, rank in enumerate(RANKS)}
+
+
+def _name_from_ranks(rank_counts: List[int], is_flush: bool) -> str:
+    """
+    Names a 5-card hand from its per-rank counts (indexed like RANKS) and whether it is a flush.
+    """
+    present = [index for index in range(13) if rank_counts[index]]
+    if len(present) == 5:
+        is_straight = present[4] - present[0] == 4 or present == [0, 1, 2, 3, 12]  # Includes A-2-3-4-5
+        if is_straight and is_flush:
+            return "Royal Flush" if present[0] == 8 else "Straight Flush"  # 8 is the index for '10'
+        if is_flush:
+            return "Flush"
+        if is_straight:
+            return "Straight"
+        return "Nothing"
+    counts = sorted((rank_counts[index] for index in present), reverse=True)
+    if counts[0] == 4:
+        return "Four of a Kind"
+    if counts == [3, 2]:
+        return "Full House"
+    if counts[0] == 3:
+        return "Three of a Kind"
+    if counts == [2, 2, 1]:
+        return "Two Pair"
+    if counts[0] == 2:
+        pair_rank = next(index for index in present if rank_counts[index] == 2)
+        if pair_rank >= 9:  # 9 is the index for 'J'
+            return "Jacks or Better"
+    return "Nothing"
+
 
 # --- Game State Class ---
 class VideoPokerGame:
     """Manages the state of a single Jacks or Better video poker game."""
-    def __init__(self, bet_amount: int):
+    paytable: Mapping[str, int] = PAYOUT_TABLE  # Also used by games rebuilt from a snapshot
+
+    def __init__(self, bet_amount: int, paytable: Mapping[str, int] = PAYOUT_TABLE):
         self.deck = Deck()
+        self.paytable = paytable  # Fixed for the whole game, even if the config is reloaded
         self.hand: List[Card] = []
         self.held_indices = [False, False, False, False, False]
         self.bet_amount = bet_amount
         self.game_over = False
 
+    @property
+    def total_bet(self) -> int:
+        """Everything at stake in this game."""
+        return self.bet_amount
+
     def start_game(self):
         """Deals the initial 5 cards."""
         for _ in range(5):
@@ -50,52 +93,81 @@ class VideoPokerGame:
         """
         Evaluates the final hand and returns the hand name and the payout amount.
         """
-        # Use RANKS.index to get a sortable value for each card rank
-        sorted_ranks = sorted([RANKS.index(card[0]) for card in self.hand])
-        suits = [card[1] for card in self.hand]
-
-        is_flush = len(set(suits)) == 1
-        # Check for standard straight (e.g., 5, 6, 7, 8, 9)
-        is_straight = (len(set(sorted_ranks)) == 5) and (sorted_ranks[4] - sorted_ranks[0] == 4)
-        # Check for Ace-low straight (A, 2, 3, 4, 5)
-        if sorted_ranks == [0, 1, 2, 3, 12]: # Indices for 2, 3, 4, 5, A
-            is_straight = True
-
-        hand_name = "Nothing" # Default case
+        rank_counts = [0] * 13
+        for card in self.hand:
+            rank_counts[_RANK_INDEX[card[0]]] += 1
+        is_flush = len({card[1] for card in self.hand}) == 1
+        hand_name = _name_from_ranks(rank_counts, is_flush)
 
-        if is_straight and is_flush:
-            # Check for Royal Flush (10, J, Q, K, A)
-            if sorted_ranks == [8, 9, 10, 11, 12]: # Indices for 10, J, Q, K, A
-                hand_name = "Royal Flush"
-            else:
-                hand_name = "Straight Flush"
-        elif is_flush:
-            hand_name = "Flush"
-        elif is_straight:
-            hand_name = "Straight"
-        else:
-            # Check for pairs, three/four of a kind by counting ranks
-            rank_counts = Counter(card[0] for card in self.hand)
-            counts = sorted(rank_counts.values(), reverse=True)
-
-            if counts[0] == 4:
-                hand_name = "Four of a Kind"
-            elif counts == [3, 2]:
-                hand_name = "Full House"
-            elif counts[0] == 3:
-                hand_name = "Three of a Kind"
-            elif counts == [2, 2, 1]:
-                hand_name = "Two Pair"
-            elif counts[0] == 2:
-                # Find the rank of the pair to check if it's Jacks or better
-                pair_rank_str = [rank for rank, count in rank_counts.items() if count == 2][0]
-                if RANKS.index(pair_rank_str) >= 9:  # 9 is the index for 'J'
-                    hand_name = "Jacks or Better"
-
-        payout_multiplier = PAYOUT_TABLE.get(hand_name, -1)
+        payout_multiplier = self.paytable.get(hand_name, -1)
         payout = int(self.bet_amount * payout_multiplier)
         return hand_name, payout
 
     def get_hand_str(self) -> str:
         """Returns a string representation of the hand."""
-        return ' '.join([f"{card[0]}{card[1]}" for card in self.hand])
\ No newline at end of file
+        return ' '.join([f"{card[0]}{card[1]}" for card in self.hand])
+
+
+# --- Multi-hand (Triple Play / Ten Play) ---
+class MultiHandPokerGame(VideoPokerGame):
+    """
+    Video poker played on several hands at once. The player holds cards on one hand,
+    and each hand completes the held cards from its own copy of the remaining deck.
+    bet_amount is the bet per hand.
+    """
+    def __init__(self, bet_amount: int, num_hands: int, paytable: Mapping[str, int] = PAYOUT_TABLE):
+        super().__init__(bet_amount, paytable)
+        self.num_hands = num_hands
+        self.hands: List[List[Card]] = []
+        self.results: List[Tuple[str, int]] = []
+
+    @property
+    def total_bet(self) -> int:
+        return self.bet_amount * self.num_hands
+
+    def draw(self, rng: Optional[random.Random] = None):
+        """
+        Completes every hand from the same 47-card remainder.
+        Each hand only needs a partial Fisher-Yates of the cards it is missing,
+        and the held cards are tallied once for all hands.
+        """
+        randrange = (rng or random).randrange
+        held = [card for card, is_held in zip(self.hand, self.held_indices) if is_held]
+        missing = 5 - len(held)
+
+        held_counts = [0] * 13
+        for card in held:
+            held_counts[_RANK_INDEX[card[0]]] += 1
+        held_suits = {card[1] for card in held}
+        flush_suit = next(iter(held_suits)) if len(held_suits) == 1 else None
+        flush_possible = len(held_suits) <= 1
+
+        remainder = self.deck.cards  # The undealt cards, shared by every hand
+        size = len(remainder)
+        self.hands, self.results = [], []
+        for _ in range(self.num_hands):
+            for j in range(missing):
+                k = randrange(j, size)
+                remainder[j], remainder[k] = remainder[k], remainder[j]
+            drawn = remainder[:missing]
+
+            rank_counts = held_counts[:]
+            for card in drawn:
+                rank_counts[_RANK_INDEX[card[0]]] += 1
+            is_flush = flush_possible and all(card[1] == (flush_suit or drawn[0][1]) for card in drawn)
+            hand_name = _name_from_ranks(rank_counts, is_flush)
+
+            drawn_cards = iter(drawn)
+            self.hands.append([card if is_held else next(drawn_cards) for card, is_held in zip(self.hand, self.held_indices)])
+            self.results.append((hand_name, int(self.bet_amount * self.paytable.get(hand_name, -1))))
+
+        self.hand = self.hands[0]
+        self.game_over = True
+
+    def total_payout(self) -> int:
+        """Net result of all hands, settled as a single wallet update."""
+        return sum(payout for _, payout in self.results)
+
+    def get_hands_str(self) -> List[str]:
+        """Returns a string representation of every completed hand."""
+        return [' '.join(f"{card[0]}{card[1]}" for card in hand) for hand in self.hands]
\ No newline at end of file
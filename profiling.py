@@ -0,0 +1,298 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# --- Settings (opt-in through environment variables) ---
+PROFILING_ENABLED = os.getenv('CASINO_PROFILING', '0') == '1'
+PROFILE_DIR = os.getenv('CASINO_PROFILE_DIR', 'profiles')
+SLOW_HANDLER_SECONDS = float(os.getenv('CASINO_SLOW_HANDLER_MS', '250')) / 1000
+LAG_SAMPLE_INTERVAL = 0.5   # Seconds between loop-lag samples
+SAMPLER_INTERVAL = 0.005    # Seconds between stack samples of the statistical profiler
+
+
+def _format_frame(frame) -> str:
+    """Returns a printable stack for the given frame."""
+    return ''.join(traceback.format_stack(frame))
+
+
+def _format_task(task: asyncio.Task) -> str:
+    """
+    Returns the printable stack of a task, following its chain of awaits down to the one it
+    is suspended on (Task.get_stack() stops at the task's own coroutine).
+    """
+    frames = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, 'cr_frame', None) or getattr(awaitable, 'gi_frame', None)
+        if frame is None:  # A finished coroutine or a plain future
+            break
+        frames.append((frame, frame.f_lineno))
+        awaitable = getattr(awaitable, 'cr_await', None) or getattr(awaitable, 'gi_yieldfrom', None)
+    return ''.join(traceback.StackSummary.extract(frames).format())
+
+
+# --- Handler Timing ---
+class HandlerStats:
+    """Tracks wall time per handler and remembers the slow invocations."""
+    def __init__(self, threshold: float = SLOW_HANDLER_SECONDS):
+        self.threshold = threshold
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.total_time: Dict[str, float] = defaultdict(float)
+        self.max_time: Dict[str, float] = defaultdict(float)
+        # (time, handler_name, elapsed, (stack kind, stack) or None)
+        self.slow_calls: Deque[Tuple[float, str, float, Optional[Tuple[str, str]]]] = deque(maxlen=50)
+        # {token: [handler_name, start_time, (stack kind, stack) or None, task]} for handlers still running
+        self.in_flight: Dict[int, list] = {}
+        self._next_token = 0
+
+    def track(self, func):
+        """Decorator that times an async handler."""
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(update, context):
+            self._next_token += 1
+            token = self._next_token
+            entry = [name, time.monotonic(), None, asyncio.current_task()]
+            self.in_flight[token] = entry
+            start = time.perf_counter()
+            try:
+                return await func(update, context)
+            finally:
+                elapsed = time.perf_counter() - start
+                del self.in_flight[token]
+                self.calls[name] += 1
+                self.total_time[name] += elapsed
+                if elapsed > self.max_time[name]:
+                    self.max_time[name] = elapsed
+                if elapsed > self.threshold:
+                    self.slow_calls.append((time.time(), name, elapsed, entry[2]))
+
+        return wrapper
+
+    def snapshot_overruns(self, frame, blocking_task: Optional[asyncio.Task]) -> None:
+        """
+        Attaches a stack to handlers running past the threshold. Called from the watchdog thread.
+        blocking_task is the task holding the loop while it is stalled (None if it isn't):
+        that handler gets the loop-thread stack (frame). Any other handler is slow because it
+        is waiting on an await, and gets its own task's stack instead.
+        """
+        now = time.monotonic()
+        for entry in list(self.in_flight.values()):
+            if now - entry[1] <= self.threshold:
+                continue
+            if blocking_task is not None and blocking_task is entry[3]:
+                if entry[2] is None or entry[2][0] != 'blocking the loop':  # Worth more than an await stack
+                    entry[2] = ('blocking the loop', _format_frame(frame))
+            elif entry[2] is None and entry[3] is not None:
+                entry[2] = ('awaiting', _format_task(entry[3]))
+
+    def summary(self, limit: int = 10) -> List[Tuple[str, int, float, float]]:
+        """Returns (name, calls, average, max) rows sorted by total time."""
+        rows = [
+            (name, count, self.total_time[name] / count, self.max_time[name])
+            for name, count in self.calls.items()
+        ]
+        rows.sort(key=lambda row: row[1] * row[2], reverse=True)
+        return rows[:limit]
+
+
+# --- Event Loop Lag ---
+class LoopLagMonitor:
+    """Samples event-loop lag and takes stack snapshots when the loop stalls."""
+    def __init__(self, handler_stats: HandlerStats, interval: float = LAG_SAMPLE_INTERVAL):
+        self.handler_stats = handler_stats
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=120)
+        self.max_lag = 0.0
+        self.stalls: Deque[Tuple[float, str]] = deque(maxlen=20)
+        self.loop_thread_id: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Starts sampling. Must be called from inside the running event loop."""
+        self.loop_thread_id = threading.get_ident()
+        self._loop = asyncio.get_running_loop()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        threading.Thread(target=self._watchdog, name='loop-watchdog', daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops the sampler task and the watchdog thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self) -> None:
+        """Measures how late each sleep wakes up."""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def _watchdog(self) -> None:
+        """Runs in its own thread so it can see the loop even while it is blocked."""
+        reported_heartbeat = None
+        while not self._stop.wait(self.interval / 2):
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            stalled = stalled_for > self.handler_stats.threshold
+            self.handler_stats.snapshot_overruns(frame, asyncio.current_task(self._loop) if stalled else None)
+            if stalled_for > self.handler_stats.threshold and heartbeat != reported_heartbeat:
+                reported_heartbeat = heartbeat
+                self.stalls.append((time.time(), _format_frame(frame)))
+
+    def average_lag(self) -> float:
+        """Average lag over the recent samples."""
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+
+# --- On-demand Profilers ---
+class StackSampler:
+    """Statistical profiler that samples the loop thread from a background thread."""
+    def __init__(self, thread_id: int, interval: float = SAMPLER_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Dict[str, int] = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def dump(self, path: str) -> None:
+        """Writes the samples in folded-stack format (flamegraph.pl / speedscope)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilerSession:
+    """Toggles a cProfile or sampling profiler and dumps the output to PROFILE_DIR."""
+    def __init__(self, output_dir: str = PROFILE_DIR):
+        self.output_dir = output_dir
+        self.mode: Optional[str] = None
+        self._profiler = None
+
+    @property
+    def running(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str = 'cprofile') -> None:
+        """Starts profiling. Call from the event loop thread."""
+        if self.running:
+            raise RuntimeError(f"Profiler already running ({self.mode})")
+        if mode == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif mode == 'sample':
+            self._profiler = StackSampler(threading.get_ident())
+            self._profiler.start()
+        else:
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        self.mode = mode
+
+    def stop(self):
+        """Stops profiling and returns a callable that writes the dump and returns its path."""
+        if not self.running:
+            raise RuntimeError("Profiler is not running")
+        profiler, mode = self._profiler, self.mode
+        if mode == 'cprofile':
+            profiler.disable()
+        else:
+            profiler.stop()
+        self._profiler, self.mode = None, None
+
+        def write() -> str:
+            os.makedirs(self.output_dir, exist_ok=True)
+            suffix = 'prof' if mode == 'cprofile' else 'folded'
+            path = os.path.join(self.output_dir, f"{mode}-{time.strftime('%Y%m%d-%H%M%S')}.{suffix}")
+            if mode == 'cprofile':
+                profiler.dump_stats(path)
+            else:
+                profiler.dump(path)
+            return path
+
+        return write
+
+
+# --- Module-level instances used by the bot ---
+handler_stats = HandlerStats()
+lag_monitor = LoopLagMonitor(handler_stats)
+profiler_session = ProfilerSession()
+
+
+def track_handler(func):
+    """Wraps a handler with timing when profiling is enabled."""
+    return handler_stats.track(func) if PROFILING_ENABLED else func
+
+
+def build_report() -> str:
+    """Plain-text report of loop lag, handler timings and recent stalls."""
+    lines = [
+        f"Loop lag: avg {lag_monitor.average_lag() * 1000:.1f} ms, max {lag_monitor.max_lag * 1000:.1f} ms",
+        f"Profiler: {profiler_session.mode or 'off'}",
+        "",
+        "Handlers (calls / avg / max):",
+    ]
+    for name, calls, avg, worst in handler_stats.summary():
+        lines.append(f"  {name}: {calls} / {avg * 1000:.1f} ms / {worst * 1000:.1f} ms")
+    if handler_stats.slow_calls:
+        lines.append("")
+        lines.append(f"Slow calls (> {handler_stats.threshold * 1000:.0f} ms):")
+        for when, name, elapsed, stack in list(handler_stats.slow_calls)[-5:]:
+            snapshot = f' ({stack[0]}, stack captured)' if stack else ''
+            lines.append(f"  {time.strftime('%H:%M:%S', time.localtime(when))} {name}: {elapsed * 1000:.0f} ms{snapshot}")
+    if lag_monitor.stalls:
+        lines.append("")
+        lines.append(f"Loop stalls: {len(lag_monitor.stalls)} recorded")
+    return '\n'.join(lines)
+
+
+def dump_stall_stacks() -> str:
+    """Writes every captured stall and slow-handler stack to a file and returns its path."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"stalls-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        for when, stack in lag_monitor.stalls:
+            f.write(f"=== Loop stall at {time.ctime(when)} ===\n{stack}\n")
+        for when, name, elapsed, stack in handler_stats.slow_calls:
+            if stack:
+                kind, text = stack
+                f.write(f"=== {name} took {elapsed * 1000:.0f} ms at {time.ctime(when)} ({kind}) ===\n{text}\n")
+    return path
@@ -0,0 +1,148 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+
+class BalanceCache:
+    """
+    Caches the rendered /balance view per user.
+    Entries are dropped on every wallet mutation, and concurrent cold reads for
+    the same user share a single backend read.
+    """
+    def __init__(self, loader: Callable[[int], Awaitable[int]], render: Callable[[int], str], max_entries: int = 10000):
+        self._loader = loader
+        self._render = render
+        self._max_entries = max_entries
+        self._views: "OrderedDict[int, str]" = OrderedDict()  # LRU of {user_id: rendered view}
+        self._pending: Dict[int, asyncio.Future] = {}         # Cold reads currently in flight
+        self._invalidated: Set[int] = set()                    # Users mutated while a read was in flight
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int) -> str:
+        """Returns the cached view, loading it (once) if needed."""
+        view = self._views.get(user_id)
+        if view is not None:
+            self._views.move_to_end(user_id)
+            self.hits += 1
+            return view
+
+        pending = self._pending.get(user_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[user_id] = future
+        try:
+            view = self._render(await self._loader(user_id))
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else is waiting
+            raise
+        except BaseException:  # Cancelled mid-read: release the coalesced waiters instead of leaving them hanging
+            future.cancel()
+            raise
+        finally:
+            del self._pending[user_id]
+            # Cleared with the pending read, so a failed read can't stop the next one from being cached
+            stale = user_id in self._invalidated
+            self._invalidated.discard(user_id)
+
+        # A mutation during the read means the view may already be stale, so don't keep it
+        if not stale:
+            self._views[user_id] = view
+            if len(self._views) > self._max_entries:
+                self._views.popitem(last=False)
+        future.set_result(view)
+        return view
+
+    def invalidate(self, user_id: int) -> None:
+        """Drops the cached view after the user's balance changed."""
+        self._views.pop(user_id, None)
+        if user_id in self._pending:
+            self._invalidated.add(user_id)
+
+    def clear(self) -> None:
+        """Drops every cached view."""
+        self._views.clear()
+        self._invalidated.update(self._pending)
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+
+class MessageRenderCache:
+    """
+    Remembers what was last rendered in each bot message, keyed by (chat_id, message_id),
+    as hashes of the text and of the keyboard. Edits that would not change anything are
+    skipped, and when only the keyboard changed just the markup is edited.
+    Works with any object shaped like a Telegram CallbackQuery.
+    """
+    def __init__(self, max_entries: int = 10000):
+        self._max_entries = max_entries
+        self._rendered: "OrderedDict[Tuple[int, int], Tuple[Optional[int], int]]" = OrderedDict()  # LRU of {(chat_id, message_id): (text hash, markup hash)}
+        self.skipped = 0
+        self.markup_only = 0
+        self.full_edits = 0
+
+    @staticmethod
+    def _text_hash(text: str, parse_mode: Optional[str]) -> int:
+        return hash((text, parse_mode))
+
+    def remember(self, message: Any, text: str, reply_markup: Any = None, parse_mode: Optional[str] = None) -> None:
+        """Records a freshly sent message so the first edit of it can already be diffed."""
+        self._store((message.chat_id, message.message_id), self._text_hash(text, parse_mode), hash(reply_markup))
+
+    async def edit(self, query: Any, text: Optional[str], reply_markup: Any = None, parse_mode: Optional[str] = None) -> bool:
+        """
+        Shows text and reply_markup in the query's message; text=None keeps the current text.
+        Returns True if an API call was made.
+        """
+        message = query.message
+        if message is None:  # Inline message, nothing to key on
+            await self._send(query, text, reply_markup, parse_mode)
+            return True
+
+        key = (message.chat_id, message.message_id)
+        previous = self._rendered.get(key)
+        markup_hash = hash(reply_markup)
+        if text is None:
+            text_hash = previous[0] if previous is not None else None
+        else:
+            text_hash = self._text_hash(text, parse_mode)
+        text_changed = text is not None and (previous is None or previous[0] != text_hash)
+        if not text_changed and previous is not None and previous[1] == markup_hash:
+            self._rendered.move_to_end(key)
+            self.skipped += 1
+            return False
+
+        try:
+            await self._send(query, text if text_changed else None, reply_markup, parse_mode)
+        except Exception as e:
+            if 'message is not modified' in str(e).lower():
+                # Same content as what is shown: now we know what that is
+                self._store(key, text_hash, markup_hash)
+                self.skipped += 1
+                return False
+            self._rendered.pop(key, None)  # Unknown state, send in full next time
+            raise
+        self._store(key, text_hash, markup_hash)
+        return True
+
+    async def _send(self, query: Any, text: Optional[str], reply_markup: Any, parse_mode: Optional[str]) -> None:
+        if text is None:
+            self.markup_only += 1
+            await query.edit_message_reply_markup(reply_markup=reply_markup)
+        else:
+            self.full_edits += 1
+            await query.edit_message_text(text=text, parse_mode=parse_mode, reply_markup=reply_markup)
+
+    def _store(self, key: Tuple[int, int], text_hash: Optional[int], markup_hash: int) -> None:
+        self._rendered[key] = (text_hash, markup_hash)
+        self._rendered.move_to_end(key)
+        if len(self._rendered) > self._max_entries:
+            self._rendered.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._rendered)
@@ -1,4 +1,6 @@
 import random
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Tuple
 
 ROULETTE_NUMBERS = {
     0: "green",
@@ -14,40 +16,55 @@ def spin_wheel():
     """Simulates a roulette spin and returns the winning number."""
     return random.randint(0, 36)
 
-def determine_outcome(winning_number: int, bet_amount: int, bet_type: str) -> int:
+# --- Payouts ---
+# Payout (x:1) per bet category; a losing bet always costs the stake
+ROULETTE_PAYOUTS = {
+    "straight": 35,   # A single number 0-36
+    "green": 35,      # Same as a single number bet on 0
+    "color": 1,
+    "odd_even": 1,
+    "high_low": 1,
+    "dozen": 2,
+    "column": 2,
+}
+
+# {bet_type: (category, winning numbers)}
+BET_COVERAGE: Dict[str, Tuple[str, FrozenSet[int]]] = {
+    "red": ("color", frozenset(n for n, color in ROULETTE_NUMBERS.items() if color == "red")),
+    "black": ("color", frozenset(n for n, color in ROULETTE_NUMBERS.items() if color == "black")),
+    "green": ("green", frozenset([0])),
+    "odd": ("odd_even", frozenset(range(1, 37, 2))),
+    "even": ("odd_even", frozenset(range(2, 37, 2))),
+    "low": ("high_low", frozenset(range(1, 19))),
+    "high": ("high_low", frozenset(range(19, 37))),
+    "1st12": ("dozen", frozenset(range(1, 13))),
+    "2nd12": ("dozen", frozenset(range(13, 25))),
+    "3rd12": ("dozen", frozenset(range(25, 37))),
+    "col1": ("column", frozenset(range(1, 37, 3))),
+    "col2": ("column", frozenset(range(2, 37, 3))),
+    "col3": ("column", frozenset(range(3, 37, 3))),
+    **{str(n): ("straight", frozenset([n])) for n in range(37)},
+}
+
+
+def compile_payout_table(payouts: Mapping[str, int]) -> Mapping[str, Tuple[int, ...]]:
+    """
+    Precomputes, for every bet type, the payout multiplier for each of the 37 winning numbers
+    (-1 where the bet loses), so settling a spin is a single lookup.
+    """
+    return MappingProxyType({
+        bet_type: tuple(payouts[category] if n in numbers else -1 for n in range(37))
+        for bet_type, (category, numbers) in BET_COVERAGE.items()
+    })
+
+
+DEFAULT_PAYOUT_TABLE = compile_payout_table(ROULETTE_PAYOUTS)
+
+
+def determine_outcome(winning_number: int, bet_amount: int, bet_type: str,
+                      payout_table: Mapping[str, Tuple[int, ...]] = DEFAULT_PAYOUT_TABLE) -> int:
     """Calculates win/loss based on winning number and bet type."""
-    bet_type = bet_type.lower()
-
-    # Payouts are for winnings (e.g., 1:1 payout means you win 1 * bet_amount)
-    if bet_type in ["red", "black"] and ROULETTE_NUMBERS[winning_number] == bet_type:
-        return bet_amount * 1  # 1:1 payout
-
-    if bet_type == "green" and winning_number == 0:
-        return bet_amount * 35  # Same as a single number bet
-
-    if bet_type.isdigit() and int(bet_type) == winning_number:
-        return bet_amount * 35  # 35:1 payout
-
-    if bet_type == "odd" and winning_number != 0 and winning_number % 2 != 0:
-        return bet_amount * 1  # 1:1 payout
-    if bet_type == "even" and winning_number != 0 and winning_number % 2 == 0:
-        return bet_amount * 1  # 1:1 payout
-    if bet_type == "high" and 19 <= winning_number <= 36:
-        return bet_amount * 1  # 1:1 payout
-    if bet_type == "low" and 1 <= winning_number <= 18:
-        return bet_amount * 1  # 1:1 payout
-    if bet_type == "1st12" and 1 <= winning_number <= 12:
-        return bet_amount * 2  # 2:1 payout
-    if bet_type == "2nd12" and 13 <= winning_number <= 24:
-        return bet_amount * 2  # 2:1 payout
-    if bet_type == "3rd12" and 25 <= winning_number <= 36:
-        return bet_amount * 2  # 2:1 payout
-    if bet_type == "col1" and winning_number != 0 and winning_number % 3 == 1:
-        return bet_amount * 2  # 2:1 payout
-    if bet_type == "col2" and winning_number != 0 and winning_number % 3 == 2:
-        return bet_amount * 2  # 2:1 payout
-    if bet_type == "col3" and winning_number != 0 and winning_number % 3 == 0:
-        return bet_amount * 2  # 2:1 payout
-
-    # If none of the above winning conditions were met, the player loses.
-    return -bet_amount
\ No newline at end of file
+    multipliers = payout_table.get(bet_type.lower())
+    if multipliers is None:  # Unknown bet types never win
+        return -bet_amount
+    return bet_amount * multipliers[winning_number]
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Hashable, List, Mapping, Optional, Tuple
+
+# --- Settings ---
+UPDATE_WORKERS = int(os.getenv('CASINO_UPDATE_WORKERS', '16'))             # Updates processed at the same time
+MAX_QUEUED_UPDATES = int(os.getenv('CASINO_MAX_QUEUED_UPDATES', '1024'))  # Updates admitted into mailboxes at once
+MAX_QUEUED_PER_USER = int(os.getenv('CASINO_MAX_QUEUED_PER_USER', '8'))     # Waiting updates per user; more are dropped
+
+
+class MailboxFull(Exception):
+    """Raised by KeyedScheduler.run when a key already has max_queued_per_key jobs waiting."""
+
+
+class KeyedScheduler:
+    """
+    Runs jobs for different keys (users) concurrently and jobs for the same key strictly in order.
+    Every key with pending jobs has a FIFO mailbox. Keys waiting for a worker sit in a
+    round-robin ready queue: a worker runs one job of the key at the front and, if that key
+    has more work, puts it back at the end, so a busy user cannot starve the others.
+    At most max_workers jobs run at once, and a key can have at most max_queued_per_key jobs
+    waiting, so one busy key cannot hold every admission slot of the caller.
+    """
+    def __init__(self, max_workers: int = UPDATE_WORKERS, max_queued_per_key: int = MAX_QUEUED_PER_USER):
+        self.max_workers = max_workers
+        self.max_queued_per_key = max_queued_per_key
+        self._mailboxes: Dict[Hashable, Deque[Tuple[Awaitable, asyncio.Future]]] = {}  # Keys with queued or running jobs
+        self._ready: Optional[asyncio.Queue] = None  # Keys with queued jobs and no job running
+        self._workers: List[asyncio.Task] = []
+        self._stopping = False  # Tells the workers that a CancelledError is for them, not from a job
+        self.processed = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def mailboxes(self) -> Mapping[Hashable, Deque[Tuple[Awaitable, asyncio.Future]]]:
+        """Mailboxes of the keys with queued or running jobs. For inspection only."""
+        return self._mailboxes
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued in mailboxes, not counting the ones running."""
+        return sum(len(mailbox) for mailbox in self._mailboxes.values())
+
+    def start(self) -> None:
+        """Starts the workers. Must be called from the event loop."""
+        if self._workers:
+            return
+        self._ready = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+
+    async def stop(self) -> None:
+        """Stops the workers and cancels every job still queued."""
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._stopping = False
+        for mailbox in self._mailboxes.values():
+            for coroutine, future in mailbox:
+                if hasattr(coroutine, 'close'):
+                    coroutine.close()  # Never started; avoids "never awaited" warnings
+                future.cancel()
+        self._mailboxes.clear()
+
+    async def run(self, key: Hashable, coroutine: Awaitable) -> Any:
+        """
+        Queues coroutine behind the earlier jobs for key and returns its result once it has run.
+        Raises MailboxFull (closing the coroutine unstarted) if key has too many jobs waiting.
+        """
+        if not self._workers:
+            raise RuntimeError("The scheduler is not running.")
+        mailbox = self._mailboxes.get(key)
+        if mailbox is not None and len(mailbox) >= self.max_queued_per_key:
+            if hasattr(coroutine, 'close'):
+                coroutine.close()
+            raise MailboxFull(key)
+        future = asyncio.get_running_loop().create_future()
+        if mailbox is None:
+            mailbox = self._mailboxes[key] = deque()
+            self._ready.put_nowait(key)
+        mailbox.append((coroutine, future))
+        return await future
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            mailbox = self._mailboxes[key]
+            coroutine, future = mailbox.popleft()
+            try:
+                if future.cancelled():  # Nobody is waiting for it any more
+                    if hasattr(coroutine, 'close'):
+                        coroutine.close()
+                    continue
+                result = await coroutine
+            except asyncio.CancelledError:
+                future.cancel()
+                if self._stopping:
+                    raise
+                # The job itself was cancelled (e.g. it awaited a cancelled future): its caller
+                # sees the cancellation and the worker moves on to the next job
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.processed += 1
+                if mailbox:
+                    self._ready.put_nowait(key)  # Back of the line: round-robin between keys
+                else:
+                    del self._mailboxes[key]
@@ -0,0 +1,207 @@
+import os
+import pickle
+import struct
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from blackjack import BlackjackGame, Deck, Hand, RANKS, SUITS
+from poker import MultiHandPokerGame, VideoPokerGame
+
+# --- Settings ---
+SNAPSHOT_PATH = os.getenv('CASINO_SNAPSHOT_PATH', 'casino_snapshot.pkl')
+SNAPSHOT_INTERVAL = float(os.getenv('CASINO_SNAPSHOT_INTERVAL', '60'))  # Seconds
+SNAPSHOT_VERSION = 1  # Bump, and pass the version to the loaders, if the record layout ever changes
+
+# --- Compact card encoding: every card is a single byte (0-51) ---
+_CARDS = [(rank, suit) for suit in SUITS for rank in RANKS]
+_CARD_CODES = {card: code for code, card in enumerate(_CARDS)}
+
+# blackjack: bet, game_over, insurance bet, surrendered, active hand, hand count, deck length, dealer cards
+_BLACKJACK_HEADER = struct.Struct('<qBqBBBBB')
+# blackjack, once per player hand: hand bet, card count
+_BLACKJACK_HAND = struct.Struct('<qB')
+# bet, game_over, held bitmask, deck length
+_POKER_HEADER = struct.Struct('<qBBB')
+
+
+def encode_cards(cards) -> bytes:
+    """Encodes a list of cards as one byte per card."""
+    return bytes(map(_CARD_CODES.__getitem__, cards))
+
+
+def decode_cards(data: bytes) -> list:
+    """Decodes bytes produced by encode_cards back into a list of cards."""
+    return list(map(_CARDS.__getitem__, data))
+
+
+def _restore_deck(data: bytes) -> Deck:
+    """Builds a Deck holding exactly the given cards, without reshuffling."""
+    deck = Deck.__new__(Deck)
+    deck.cards = decode_cards(data)
+    return deck
+
+
+def _restore_hand(data: bytes) -> Hand:
+    """Rebuilds a Hand, recomputing its value and soft aces."""
+    hand = Hand()
+    for card in decode_cards(data):
+        hand.add_card(card)
+    return hand
+
+
+# --- Blackjack ---
+def dump_blackjack(game: BlackjackGame) -> bytes:
+    """Serializes the deck remainder, every hand with its bet, insurance and surrender."""
+    deck = encode_cards(game.deck.cards)
+    dealer = encode_cards(game.dealer_hand.cards)
+    parts = [
+        _BLACKJACK_HEADER.pack(
+            game.bet_amount, game.game_over, game.insurance_bet, game.surrendered,
+            game.active_hand, len(game.player_hands), len(deck), len(dealer),
+        ),
+        deck,
+        dealer,
+    ]
+    for hand, bet in zip(game.player_hands, game.hand_bets):
+        parts.append(_BLACKJACK_HAND.pack(bet, len(hand.cards)))
+        parts.append(encode_cards(hand.cards))
+    return b''.join(parts)
+
+
+def load_blackjack(data: bytes) -> BlackjackGame:
+    """Inverse of dump_blackjack."""
+    (bet_amount, game_over, insurance_bet, surrendered,
+     active_hand, num_hands, deck_len, dealer_len) = _BLACKJACK_HEADER.unpack_from(data)
+    offset = _BLACKJACK_HEADER.size
+    game = BlackjackGame.__new__(BlackjackGame)
+    game.deck = _restore_deck(data[offset:offset + deck_len])
+    offset += deck_len
+    game.dealer_hand = _restore_hand(data[offset:offset + dealer_len])
+    offset += dealer_len
+    game.player_hands, game.hand_bets = [], []
+    for _ in range(num_hands):
+        bet, card_count = _BLACKJACK_HAND.unpack_from(data, offset)
+        offset += _BLACKJACK_HAND.size
+        game.player_hands.append(_restore_hand(data[offset:offset + card_count]))
+        game.hand_bets.append(bet)
+        offset += card_count
+    game.active_hand = active_hand
+    game.bet_amount = bet_amount
+    game.insurance_bet = insurance_bet
+    game.surrendered = bool(surrendered)
+    game.game_over = bool(game_over)
+    return game
+
+
+# --- Video Poker ---
+def dump_poker(game: VideoPokerGame) -> bytes:
+    """Serializes the deck remainder, the hand, the held cards and the number of hands."""
+    deck = encode_cards(game.deck.cards)
+    held_mask = sum(1 << i for i, held in enumerate(game.held_indices) if held)
+    header = _POKER_HEADER.pack(game.bet_amount, game.game_over, held_mask, len(deck))
+    return header + deck + encode_cards(game.hand) + bytes((getattr(game, 'num_hands', 1),))
+
+
+def load_poker(data: bytes) -> VideoPokerGame:
+    """Inverse of dump_poker."""
+    bet_amount, game_over, held_mask, deck_len = _POKER_HEADER.unpack_from(data)
+    offset = _POKER_HEADER.size
+    num_hands = data[offset + deck_len + 5]
+    if num_hands > 1:
+        game = MultiHandPokerGame.__new__(MultiHandPokerGame)
+        game.num_hands = num_hands
+        game.hands, game.results = [], []
+    else:
+        game = VideoPokerGame.__new__(VideoPokerGame)
+    game.deck = _restore_deck(data[offset:offset + deck_len])
+    game.hand = decode_cards(data[offset + deck_len:offset + deck_len + 5])
+    game.held_indices = [bool(held_mask & (1 << i)) for i in range(5)]
+    game.bet_amount = bet_amount
+    game.game_over = bool(game_over)
+    return game
+
+
+# --- Whole-store snapshots ---
+def build_snapshot(balances: Dict[int, int], blackjack_games: Dict[int, BlackjackGame],
+                   poker_games: Dict[int, VideoPokerGame]) -> dict:
+    """
+    Encodes the current stores into a plain dict.
+    Balances are included because a restored game settles against them.
+    """
+    return {
+        'version': SNAPSHOT_VERSION,
+        'saved_at': time.time(),
+        'balances': dict(balances),
+        'blackjack': {user_id: dump_blackjack(game) for user_id, game in blackjack_games.items()},
+        'poker': {user_id: dump_poker(game) for user_id, game in poker_games.items()},
+    }
+
+
+class SnapshotBuilder:
+    """
+    Builds the same snapshots as build_snapshot, but keeps the encoding of every open game
+    and only re-encodes the games reported through mark_changed since the previous build.
+    Subscribe mark_changed to CasinoService.game_listeners.
+    """
+    def __init__(self):
+        self._encoded: Dict[str, Dict[int, bytes]] = {'blackjack': {}, 'poker': {}}  # {game: {user_id: record}}
+        self._changed: Set[Tuple[int, str]] = set()  # (user_id, game) changed since the last build
+
+    def mark_changed(self, user_id: int, game: str) -> None:
+        """Records that a user's open game was created, changed or closed."""
+        self._changed.add((user_id, game))
+
+    def build(self, balances: Dict[int, int], blackjack_games: Dict[int, BlackjackGame],
+              poker_games: Dict[int, VideoPokerGame]) -> dict:
+        """Encodes the current stores, reusing the records of unchanged games."""
+        stores: Dict[str, Tuple[dict, Callable[..., bytes]]] = {
+            'blackjack': (blackjack_games, dump_blackjack),
+            'poker': (poker_games, dump_poker),
+        }
+        for user_id, game in self._changed:
+            games, dump = stores[game]
+            current = games.get(user_id)
+            if current is None:
+                self._encoded[game].pop(user_id, None)
+            else:
+                self._encoded[game][user_id] = dump(current)
+        self._changed.clear()
+
+        for game, (games, dump) in stores.items():
+            if len(games) != len(self._encoded[game]):  # A change was never reported: start over
+                self._encoded[game] = {user_id: dump(open_game) for user_id, open_game in games.items()}
+        return {
+            'version': SNAPSHOT_VERSION,
+            'saved_at': time.time(),
+            'balances': dict(balances),
+            'blackjack': dict(self._encoded['blackjack']),
+            'poker': dict(self._encoded['poker']),
+        }
+
+
+def write_snapshot(snapshot: dict, path: str = SNAPSHOT_PATH) -> None:
+    """Atomically writes a snapshot so a crash mid-write never leaves a torn file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str = SNAPSHOT_PATH) -> Optional[Tuple[Dict[int, int], Dict[int, BlackjackGame], Dict[int, VideoPokerGame]]]:
+    """
+    Loads a snapshot written by write_snapshot.
+    Returns (balances, blackjack_games, poker_games), or None if there is nothing usable.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        snapshot = pickle.load(f)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        print(f"Ignoring snapshot {path}: unsupported version {snapshot.get('version')}")
+        return None
+
+    blackjack_games = {user_id: load_blackjack(data) for user_id, data in snapshot['blackjack'].items()}
+    poker_games = {user_id: load_poker(data) for user_id, data in snapshot['poker'].items()}
+    return snapshot['balances'], blackjack_games, poker_games
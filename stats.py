@@ -0,0 +1,153 @@
+import random
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+GAMES = ('roulette', 'blackjack', 'poker')
+
+
+# --- Leaderboard ---
+MAX_LEVEL = 16  # Enough for 4**16 users with LEVEL_PROBABILITY = 1/4
+LEVEL_PROBABILITY = 0.25
+
+
+class _Node:
+    __slots__ = ('key', 'next')
+
+    def __init__(self, key: Optional[Tuple[int, int]], level: int):
+        self.key = key                                       # (-score, user_id); None for the head
+        self.next: List[Optional[_Node]] = [None] * level   # Successor on each level
+
+
+class Leaderboard:
+    """
+    Keeps every user ordered by score in a skip list, so an update is O(log N) expected
+    and the top K are read in O(K).
+    """
+    def __init__(self):
+        self._head = _Node(None, MAX_LEVEL)
+        self._level = 1                    # Levels currently in use
+        self._scores: Dict[int, int] = {}  # {user_id: score}
+
+    def update(self, user_id: int, score: int) -> None:
+        """Sets a user's score, moving them to their new position."""
+        old_score = self._scores.get(user_id)
+        if old_score == score:
+            return
+        if old_score is not None:
+            self._remove((-old_score, user_id))
+        self._scores[user_id] = score
+        self._insert((-score, user_id))
+
+    def top(self, k: int) -> List[Tuple[int, int]]:
+        """Returns up to k (user_id, score) pairs, best first."""
+        result = []
+        node = self._head.next[0]
+        while node is not None and len(result) < k:
+            neg_score, user_id = node.key
+            result.append((user_id, -neg_score))
+            node = node.next[0]
+        return result
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def memory_footprint(self, sample_size: int) -> int:
+        """
+        Approximate bytes held, for memory reports. Walking the nodes would visit every user,
+        so it is extrapolated from the first sample_size nodes; levels are random, so any run
+        of nodes is a fair sample.
+        """
+        sampled, count = 0, 0
+        node = self._head.next[0]
+        while node is not None and count < sample_size:
+            neg_score, user_id = node.key
+            sampled += sum(map(sys.getsizeof, (node, node.next, node.key, neg_score, user_id, self._scores[user_id])))
+            node, count = node.next[0], count + 1
+        fixed = sys.getsizeof(self) + sys.getsizeof(self._scores) + sys.getsizeof(self._head.next)
+        return fixed + (sampled * len(self._scores) // count if count else 0)
+
+    def _predecessors(self, key: Tuple[int, int]) -> List[_Node]:
+        """The last node before key on every level."""
+        predecessors = [self._head] * MAX_LEVEL
+        node = self._head
+        for level in range(self._level - 1, -1, -1):
+            following = node.next[level]
+            while following is not None and following.key < key:
+                node, following = following, following.next[level]
+            predecessors[level] = node
+        return predecessors
+
+    def _insert(self, key: Tuple[int, int]) -> None:
+        level = 1
+        while level < MAX_LEVEL and random.random() < LEVEL_PROBABILITY:
+            level += 1
+        self._level = max(self._level, level)
+        predecessors = self._predecessors(key)
+        node = _Node(key, level)
+        for i in range(level):
+            node.next[i] = predecessors[i].next[i]
+            predecessors[i].next[i] = node
+
+    def _remove(self, key: Tuple[int, int]) -> None:
+        predecessors = self._predecessors(key)
+        node = predecessors[0].next[0]
+        for i in range(len(node.next)):
+            predecessors[i].next[i] = node.next[i]
+
+
+# --- Per-user Stats ---
+class StatsService:
+    """
+    Per-user, per-game counters fed from every settlement.
+    Each counter is a compact array indexed by a per-user slot, so a read is a handful of lookups.
+    """
+    def __init__(self):
+        self._slots: Dict[int, int] = {}  # {user_id: index into the arrays}
+        self._played = {game: array('q') for game in GAMES}
+        self._won = {game: array('q') for game in GAMES}
+        self._biggest_win = {game: array('q') for game in GAMES}
+        self._net = {game: array('q') for game in GAMES}
+        self.leaderboard = Leaderboard()
+
+    def _slot(self, user_id: int) -> int:
+        """Returns the user's slot, growing every array by one for new users."""
+        slot = self._slots.get(user_id)
+        if slot is None:
+            slot = len(self._slots)
+            self._slots[user_id] = slot
+            for counters in (self._played, self._won, self._biggest_win, self._net):
+                for column in counters.values():
+                    column.append(0)
+        return slot
+
+    def record(self, user_id: int, game: str, payout: int, balance: int) -> None:
+        """Records one settled round. payout is the net change to the balance."""
+        slot = self._slot(user_id)
+        self._played[game][slot] += 1
+        self._net[game][slot] += payout
+        if payout > 0:
+            self._won[game][slot] += 1
+            if payout > self._biggest_win[game][slot]:
+                self._biggest_win[game][slot] = payout
+        self.leaderboard.update(user_id, balance)
+
+    def user_stats(self, user_id: int) -> Dict[str, Dict[str, int]]:
+        """Returns {game: {played, won, biggest_win, net}} for games the user has played."""
+        slot = self._slots.get(user_id)
+        if slot is None:
+            return {}
+        return {
+            game: {
+                'played': self._played[game][slot],
+                'won': self._won[game][slot],
+                'biggest_win': self._biggest_win[game][slot],
+                'net': self._net[game][slot],
+            }
+            for game in GAMES
+            if self._played[game][slot]
+        }
+
+    def top(self, k: int = 10) -> List[Tuple[int, int]]:
+        """Returns the k users with the highest balance."""
+        return self.leaderboard.top(k)
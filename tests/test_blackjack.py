@@ -0,0 +1,57 @@
+from blackjack import BlackjackGame
+
+
+def rigged_game(player, dealer, draws=(), bet_amount=100):
+    """A started game with the given initial cards; draws come off the deck in order."""
+    game = BlackjackGame(bet_amount)
+    deal_order = [player[0], dealer[0], player[1], dealer[1], *draws]
+    game.deck.cards = [(rank, '♠️') for rank in reversed(deal_order)]
+    game.start_game()
+    return game
+
+
+def test_surrender_loses_half_the_bet():
+    game = rigged_game(player=('10', '6'), dealer=('9', '8'))
+    game.player_surrenders()
+    assert game.settle() == ([('surrender', -50)], 0)
+
+
+def test_surrender_loss_rounds_up():
+    game = rigged_game(player=('10', '6'), dealer=('9', '8'), bet_amount=1)
+    game.player_surrenders()
+    assert game.settle() == ([('surrender', -1)], 0)
+
+
+def test_insured_surrender_against_dealer_blackjack_pays_insurance():
+    game = rigged_game(player=('10', '6'), dealer=('A', 'K'))
+    game.player_insures()
+    assert game.can_surrender()
+    game.player_surrenders()
+    assert game.settle() == ([('surrender', -50)], 100)
+
+
+def test_insured_surrender_without_dealer_blackjack_loses_insurance():
+    game = rigged_game(player=('10', '6'), dealer=('A', '7'))
+    game.player_insures()
+    game.player_surrenders()
+    assert game.settle() == ([('surrender', -50)], -50)
+
+
+def test_dealer_blackjack_beats_doubled_hand():
+    game = rigged_game(player=('5', '6'), dealer=('A', 'K'), draws=('10',))
+    game.player_doubles()
+    assert game.settle() == ([('loss', -200)], 0)
+
+
+def test_split_hands_are_settled_separately():
+    game = rigged_game(player=('8', '8'), dealer=('10', '7'), draws=('3', '10', '2'))
+    game.player_splits()  # First hand: 8 3
+    game.player_hits()    # 8 3 10 = 21
+    game.player_stands()  # Second hand gets its card: 8 2
+    game.player_stands()
+    assert game.settle() == ([('win', 100), ('loss', -100)], 0)
+
+
+def test_natural_blackjack_pays_three_to_two():
+    game = rigged_game(player=('A', 'K'), dealer=('9', '8'))
+    assert game.settle() == ([('blackjack', 150)], 0)
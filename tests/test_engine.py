@@ -0,0 +1,15 @@
+import asyncio
+
+from engine import UNKNOWN_GAME, CasinoService
+
+
+def test_act_refuses_games_without_moves():
+    casino = CasinoService()
+    casino.open_account(1)
+    asyncio.run(casino.place_bet(1, 'poker', 10))
+
+    for game in ('roulette', 'dice'):
+        result = asyncio.run(casino.act(1, game, 'draw'))
+        assert result.error == UNKNOWN_GAME
+        assert not casino.has_game(1, game)
+    assert casino.has_game(1, 'poker')  # The poker game was not touched
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from engine import CasinoService
+from game_config import DEFAULT_CONFIG, ConfigStore, compile_config
+
+
+@pytest.mark.parametrize('raw', [
+    {'jackpot': 1},
+    {'poker_paytable': {'Five Aces': 100}},
+    {'poker_paytable': {'Flush': 6.5}},
+    {'poker_paytable': {'Flush': True}},
+    {'poker_paytable': []},
+    {'roulette_payouts': {'straight': 0}},
+    {'blackjack_payout': 0},
+    {'blackjack_payout': '1.5'},
+    {'bet_amounts': []},
+    {'bet_amounts': [10, -5]},
+    {'bet_amounts': [10, 2.5]},
+    {'bet_amounts': list(range(1, 10))},
+])
+def test_invalid_configs_are_rejected(raw):
+    with pytest.raises(ValueError):
+        compile_config(raw)
+
+
+def test_missing_keys_keep_their_defaults():
+    config = compile_config({'poker_paytable': {'Flush': 5}, 'bet_amounts': [5, 20]})
+    assert config.poker_paytable['Flush'] == 5
+    assert config.poker_paytable['Full House'] == DEFAULT_CONFIG.poker_paytable['Full House']
+    assert config.bet_amounts == (5, 20)
+    assert config.blackjack_payout == DEFAULT_CONFIG.blackjack_payout
+
+
+def write_config(path, raw):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(raw if isinstance(raw, str) else json.dumps(raw))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # Coarse clocks: force a new mtime
+
+
+def test_reload_swaps_only_on_a_valid_change(tmp_path):
+    path = str(tmp_path / 'casino_config.json')
+    write_config(path, {'bet_amounts': [5]})
+    store = ConfigStore(path)
+    store.load()
+    assert store.current.bet_amounts == (5,)
+
+    assert not asyncio.run(store.reload())  # Unchanged file
+    write_config(path, {'bet_amounts': [7, 8]})
+    assert asyncio.run(store.reload())
+    assert store.current.bet_amounts == (7, 8)
+
+    valid = store.current
+    write_config(path, '{"bet_amounts": [')
+    assert not asyncio.run(store.reload())
+    write_config(path, {'bet_amounts': 'lots'})
+    assert not asyncio.run(store.reload())
+    assert store.current is valid
+
+
+def test_games_keep_the_rules_they_started_with(tmp_path):
+    path = str(tmp_path / 'casino_config.json')
+    write_config(path, {'poker_paytable': {'Flush': 6}, 'blackjack_payout': 1.5})
+    store = ConfigStore(path)
+    store.load()
+    casino = CasinoService(config=store)
+    casino.open_account(1)
+
+    async def play():
+        await casino.place_bet(1, 'poker', 10)
+        blackjack = await casino.place_bet(1, 'blackjack', 10)
+        write_config(path, {'poker_paytable': {'Flush': 4}, 'blackjack_payout': 1.2})
+        assert await store.reload()
+        return blackjack.state
+
+    blackjack_game = asyncio.run(play())
+    assert casino.poker_games[1].paytable['Flush'] == 6
+    assert blackjack_game.blackjack_payout == 1.5
+    assert store.current.poker_paytable['Flush'] == 4
+    assert store.current.blackjack_payout == 1.2
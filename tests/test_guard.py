@@ -0,0 +1,117 @@
+import asyncio
+
+from blackjack import BlackjackGame
+from engine import CasinoService
+from guard import RATE_LIMIT_MESSAGE, BetGuard, SlidingWindowCounter
+
+
+def test_sliding_window_weights_the_previous_window():
+    counter = SlidingWindowCounter(60)
+    for _ in range(10):
+        counter.add(1, now=30)
+    assert counter.estimate(1, now=30) == 10
+    assert counter.estimate(1, now=75) == 7.5  # A quarter into the next window
+    assert counter.estimate(1, now=150) == 0   # Two windows later nothing carries over
+
+
+def test_bet_rate_limit_counts_accepted_bets_only():
+    guard = BetGuard(bets_per_minute=2)
+    assert guard.check(1, 'roulette', 0, 100, now=0) is not None  # Refused, not counted
+    assert guard.check(1, 'roulette', 10, 100, now=0) is None
+    assert guard.check(1, 'roulette', 10, 100, now=1) is None
+    assert guard.check(1, 'roulette', 10, 100, now=2) == RATE_LIMIT_MESSAGE
+
+
+def test_daily_loss_limit_applies_to_raises():
+    guard = BetGuard(daily_loss_limit=100)
+    guard.record_settlement(1, -60, now=0)
+    assert guard.check(1, 'blackjack', 40, 1000, now=1) is None
+    assert guard.check_raise(1, 80, now=2) is not None
+    assert guard.check_raise(1, 80, now=86400) is None  # A new day starts from zero
+
+
+def rigged_blackjack(casino, user_id, player, dealer, bet_amount):
+    """Puts an open blackjack game with the given cards on the table."""
+    game = BlackjackGame(bet_amount)
+    for rank in player:
+        game.player_hand.add_card((rank, '♣️'))
+    for rank in dealer:
+        game.dealer_hand.add_card((rank, '♦️'))
+    casino.blackjack_games[user_id] = game
+    return game
+
+
+def test_double_and_split_are_refused_past_the_daily_loss_limit():
+    casino = CasinoService(guard=BetGuard(daily_loss_limit=150))
+    casino.open_account(1)
+    game = rigged_blackjack(casino, 1, ('8', '8'), ('10', '7'), 100)
+
+    for action in ('double', 'split'):
+        result = asyncio.run(casino.act(1, 'blackjack', action))
+        assert result.error and 'límite de pérdidas' in result.error
+    assert game.hand_bets == [100]
+
+
+def test_insurance_is_refused_past_the_daily_loss_limit():
+    casino = CasinoService(guard=BetGuard(daily_loss_limit=120))
+    casino.open_account(1)
+    game = rigged_blackjack(casino, 1, ('10', '6'), ('A', '7'), 100)
+
+    result = asyncio.run(casino.act(1, 'blackjack', 'insurance'))
+    assert result.error and 'límite de pérdidas' in result.error
+    assert game.insurance_bet == 0
+
+
+def test_double_within_the_daily_loss_limit_goes_ahead():
+    casino = CasinoService(guard=BetGuard(daily_loss_limit=1000))
+    casino.open_account(1)
+    rigged_blackjack(casino, 1, ('5', '6'), ('10', '7'), 100)
+
+    result = asyncio.run(casino.act(1, 'blackjack', 'double'))
+    assert result.error is None and result.finished
+    assert result.details['results'][0][1] in (-200, 0, 200)
+
+
+def test_stakes_in_open_games_count_against_balance_and_loss_limit():
+    casino = CasinoService(guard=BetGuard(daily_loss_limit=1000))
+    casino.open_account(1)  # Balance 1000
+
+    async def play():
+        assert (await casino.place_bet(1, 'poker', 10, num_hands=10)).error is None  # 100 at stake
+        rigged_blackjack(casino, 1, ('10', '6'), ('10', '7'), 800)                  # 900 at stake
+        assert casino.open_stake(1) == 900
+        return (
+            await casino.place_bet(1, 'roulette', 200, bet_type='red'),
+            await casino.place_bet(1, 'roulette', 100, bet_type='red'),
+        )
+
+    too_much, all_in = asyncio.run(play())
+    assert too_much.error and 'saldo suficiente' in too_much.error
+    assert all_in.error is None
+    game = casino.blackjack_games[1]
+    assert not casino.blackjack_options(1, game)['double']
+
+
+def test_open_stakes_count_towards_the_daily_loss_limit():
+    guard = BetGuard(daily_loss_limit=1000)
+    guard.record_settlement(1, -300, now=0)
+    assert guard.check(1, 'roulette', 100, 5000, open_stake=700, now=1) is not None
+    assert guard.check(1, 'roulette', 100, 5000, open_stake=600, now=2) is None
+    assert guard.check_raise(1, 800, now=3) is not None
+
+
+def test_open_poker_hands_block_further_bets_on_the_same_balance():
+    casino = CasinoService(guard=BetGuard(daily_loss_limit=1000))
+    casino.open_account(1)
+
+    async def play():
+        return [
+            await casino.place_bet(1, 'poker', 100, num_hands=10),
+            await casino.place_bet(1, 'blackjack', 900),
+            await casino.place_bet(1, 'roulette', 900, bet_type='red'),
+        ]
+
+    poker, blackjack, roulette = asyncio.run(play())
+    assert poker.error is None
+    assert blackjack.error and roulette.error
+    assert casino.get_balance(1) == 1000
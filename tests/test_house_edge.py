@@ -0,0 +1,15 @@
+from game_config import DEFAULT_CONFIG, compile_config
+from house_edge import roulette_report
+
+
+def test_default_roulette_bets_all_return_minus_one_in_37():
+    for bet_type, expected_return, variance in roulette_report(DEFAULT_CONFIG):
+        assert abs(expected_return + 1 / 37) < 1e-12, bet_type
+        assert variance > 0
+
+
+def test_roulette_report_follows_the_config():
+    config = compile_config({'roulette_payouts': {'straight': 36}})
+    rows = {bet_type: expected_return for bet_type, expected_return, _ in roulette_report(config)}
+    assert abs(rows['17']) < 1e-12  # 36:1 on a single number is a fair bet on a single-zero wheel
+    assert abs(rows['red'] + 1 / 37) < 1e-12
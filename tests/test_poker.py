@@ -0,0 +1,68 @@
+import asyncio
+import random
+
+from engine import CasinoService
+from guard import BetGuard
+from poker import MULTI_HAND_COUNTS, MultiHandPokerGame, VideoPokerGame
+
+
+def evaluate(hand, bet_amount, paytable):
+    """Result of a single hand, as the single-hand game scores it."""
+    game = VideoPokerGame(bet_amount, paytable)
+    game.hand = list(hand)
+    return game.evaluate_hand()
+
+
+def test_multi_hand_draws_keep_held_cards_and_score_every_hand():
+    rng = random.Random(2024)
+    for _ in range(300):
+        game = MultiHandPokerGame(5, rng.choice(MULTI_HAND_COUNTS))
+        game.start_game()
+        for index in range(5):
+            if rng.random() < 0.5:
+                game.toggle_hold(index)
+        dealt, held = list(game.hand), list(game.held_indices)
+        game.draw(rng)
+
+        assert len(game.hands) == len(game.results) == game.num_hands
+        for hand, result in zip(game.hands, game.results):
+            assert len(set(hand)) == 5
+            assert all(card == dealt[i] for i, card in enumerate(hand) if held[i])
+            assert not set(hand[i] for i in range(5) if not held[i]) & set(dealt)  # Replacements are new cards
+            assert result == evaluate(hand, game.bet_amount, game.paytable)
+        assert game.total_payout() == sum(payout for _, payout in game.results)
+        assert game.game_over
+
+
+def test_holding_every_card_repeats_the_hand():
+    game = MultiHandPokerGame(10, 3)
+    game.start_game()
+    for index in range(5):
+        game.toggle_hold(index)
+    dealt = list(game.hand)
+    game.draw(random.Random(1))
+    assert game.hands == [dealt] * 3
+    assert len(set(game.results)) == 1
+
+
+def test_engine_settles_every_hand_in_one_wallet_update():
+    casino = CasinoService(guard=BetGuard(daily_loss_limit=0))
+    casino.open_account(1)
+    settlements = []
+    settle = casino.settle
+
+    def record_settle(user_id, game, payout):
+        settlements.append(payout)
+        return settle(user_id, game, payout)
+
+    casino.settle = record_settle
+
+    async def play():
+        await casino.place_bet(1, 'poker', 10, num_hands=10)
+        return await casino.act(1, 'poker', 'draw')
+
+    result = asyncio.run(play())
+    assert result.finished and len(result.details['results']) == 10
+    assert settlements == [result.payout] == [result.state.total_payout()]
+    assert casino.get_balance(1) == 1000 + result.payout
+    assert not casino.has_game(1, 'poker')
@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from response_cache import BalanceCache, MessageRenderCache
+
+
+def test_concurrent_cold_reads_share_one_load():
+    loads = []
+
+    async def loader(user_id):
+        loads.append(user_id)
+        await asyncio.sleep(0)
+        return 100
+
+    async def run():
+        cache = BalanceCache(loader, str)
+        return await asyncio.gather(*(cache.get(1) for _ in range(5)))
+
+    assert asyncio.run(run()) == ['100'] * 5
+    assert loads == [1]
+
+
+def test_cancelled_load_releases_waiters():
+    async def run():
+        loading = asyncio.Event()
+
+        async def loader(user_id):
+            loading.set()
+            await asyncio.sleep(3600)
+
+        cache = BalanceCache(loader, str)
+        first = asyncio.create_task(cache.get(1))
+        await loading.wait()
+        second = asyncio.create_task(cache.get(1))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(second, timeout=1)
+
+    asyncio.run(run())
+
+
+class FakeQuery:
+    """Records the edits a CallbackQuery would send; fail_with makes the next edit raise."""
+    def __init__(self, chat_id=1, message_id=10):
+        self.message = SimpleNamespace(chat_id=chat_id, message_id=message_id)
+        self.calls = []
+        self.fail_with = None
+
+    async def edit_message_text(self, text, parse_mode=None, reply_markup=None):
+        self._record(('text', text, reply_markup))
+
+    async def edit_message_reply_markup(self, reply_markup=None):
+        self._record(('markup', reply_markup))
+
+    def _record(self, call):
+        if self.fail_with is not None:
+            error, self.fail_with = self.fail_with, None
+            raise error
+        self.calls.append(call)
+
+
+def edit(cache, query, text, reply_markup=None):
+    return asyncio.run(cache.edit(query, text, reply_markup=reply_markup))
+
+
+def test_identical_edit_is_skipped():
+    cache, query = MessageRenderCache(), FakeQuery()
+    assert edit(cache, query, 'hola', ('a',))
+    assert not edit(cache, query, 'hola', ('a',))
+    assert query.calls == [('text', 'hola', ('a',))]
+    assert cache.skipped == 1
+
+
+def test_keyboard_only_change_edits_the_markup():
+    cache, query = MessageRenderCache(), FakeQuery()
+    edit(cache, query, 'hola', ('a',))
+    assert edit(cache, query, 'hola', ('b',))
+    assert query.calls[-1] == ('markup', ('b',))
+    assert cache.markup_only == 1
+
+
+def test_no_text_keeps_the_current_text():
+    cache, query = MessageRenderCache(), FakeQuery()
+    edit(cache, query, 'hola', ('a',))
+    assert edit(cache, query, None, ('b',))
+    assert not edit(cache, query, 'hola', ('b',))  # The text is still known to be 'hola'
+    assert query.calls == [('text', 'hola', ('a',)), ('markup', ('b',))]
+
+
+def test_remembered_message_is_diffed_on_first_edit():
+    cache, query = MessageRenderCache(), FakeQuery()
+    cache.remember(query.message, 'hola', ('a',))
+    assert not edit(cache, query, 'hola', ('a',))
+    assert query.calls == []
+
+
+def test_not_modified_error_records_the_shown_content():
+    cache, query = MessageRenderCache(), FakeQuery()
+    query.fail_with = Exception("Bad Request: message is not modified")
+    assert not edit(cache, query, 'hola', ('a',))
+    assert not edit(cache, query, 'hola', ('a',))
+    assert query.calls == []
+    assert cache.skipped == 2
+
+
+def test_other_errors_forget_the_message():
+    cache, query = MessageRenderCache(), FakeQuery()
+    edit(cache, query, 'hola', ('a',))
+    query.fail_with = RuntimeError("network down")
+    with pytest.raises(RuntimeError):
+        edit(cache, query, 'adiós', ('a',))
+    assert len(cache) == 0
+    assert edit(cache, query, 'hola', ('a',))  # Sent in full again
+    assert query.calls[-1] == ('text', 'hola', ('a',))
+
+
+def test_failed_load_does_not_stop_the_next_one_from_being_cached():
+    calls = []
+
+    async def run():
+        loading = asyncio.Event()
+
+        async def loader(user_id):
+            calls.append(user_id)
+            if len(calls) == 1:
+                loading.set()
+                await asyncio.sleep(0)
+                raise ConnectionError("backend down")
+            return 100
+
+        cache = BalanceCache(loader, str)
+        first = asyncio.create_task(cache.get(1))
+        await loading.wait()
+        cache.invalidate(1)  # A wallet change while the failing read is in flight
+        with pytest.raises(ConnectionError):
+            await first
+        assert await cache.get(1) == '100'
+        assert await cache.get(1) == '100'
+        return cache.hits
+
+    assert asyncio.run(run()) == 1
+    assert len(calls) == 2
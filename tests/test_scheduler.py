@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from scheduler import KeyedScheduler, MailboxFull
+
+
+def run_with_scheduler(body, max_workers=4):
+    async def main():
+        scheduler = KeyedScheduler(max_workers)
+        scheduler.start()
+        try:
+            return await body(scheduler)
+        finally:
+            await scheduler.stop()
+    return asyncio.run(main())
+
+
+def test_jobs_for_one_key_run_in_order_and_one_at_a_time():
+    log = []
+
+    async def job(key, n):
+        log.append((key, n, 'start'))
+        await asyncio.sleep(0)
+        log.append((key, n, 'end'))
+        return n
+
+    async def body(scheduler):
+        return await asyncio.gather(*(scheduler.run(key, job(key, n)) for n in range(5) for key in 'ab'))
+
+    assert run_with_scheduler(body) == [n for n in range(5) for _ in 'ab']
+    for key in 'ab':
+        events = [(n, event) for k, n, event in log if k == key]
+        assert events == [(n, event) for n in range(5) for event in ('start', 'end')]
+
+
+def test_different_keys_run_concurrently_up_to_max_workers():
+    running, peak = 0, 0
+
+    async def job():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def body(scheduler):
+        await asyncio.gather(*(scheduler.run(key, job()) for key in range(10)))
+        return scheduler.processed
+
+    assert run_with_scheduler(body, max_workers=3) == 10
+    assert peak == 3
+
+
+def test_a_failing_job_does_not_block_the_key():
+    async def fail():
+        raise ValueError("boom")
+
+    async def succeed():
+        return 'ok'
+
+    async def body(scheduler):
+        with pytest.raises(ValueError):
+            await scheduler.run(1, fail())
+        return await scheduler.run(1, succeed())
+
+    assert run_with_scheduler(body) == 'ok'
+
+
+def test_stop_cancels_queued_jobs():
+    async def main():
+        started = asyncio.Event()
+
+        async def block():
+            started.set()
+            await asyncio.sleep(3600)
+
+        scheduler = KeyedScheduler(1)
+        scheduler.start()
+        blocker = asyncio.create_task(scheduler.run(1, block()))
+        queued = asyncio.create_task(scheduler.run(1, asyncio.sleep(0)))
+        await started.wait()
+        assert scheduler.pending == 1
+        await scheduler.stop()
+        for task in (blocker, queued):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        assert not scheduler.mailboxes
+
+    asyncio.run(main())
+
+
+def test_run_requires_a_started_scheduler():
+    async def main():
+        coroutine = asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            await KeyedScheduler().run(1, coroutine)
+        coroutine.close()
+
+    asyncio.run(main())
+
+
+def test_a_job_raising_cancelled_error_does_not_kill_its_worker():
+    async def cancelled_job():
+        raise asyncio.CancelledError()
+
+    async def succeed():
+        return 'ok'
+
+    async def body(scheduler):
+        for key in (1, 2):
+            with pytest.raises(asyncio.CancelledError):
+                await scheduler.run(key, cancelled_job())
+        return await asyncio.wait_for(scheduler.run(3, succeed()), timeout=1)
+
+    assert run_with_scheduler(body, max_workers=2) == 'ok'
+
+
+def test_jobs_past_the_per_key_cap_are_refused():
+    async def main():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def block():
+            started.set()
+            await release.wait()
+
+        scheduler = KeyedScheduler(max_workers=2, max_queued_per_key=2)
+        scheduler.start()
+        running = asyncio.create_task(scheduler.run(1, block()))
+        await started.wait()
+        queued = [asyncio.create_task(scheduler.run(1, asyncio.sleep(0))) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        coroutine = asyncio.sleep(0)
+        with pytest.raises(MailboxFull):
+            await scheduler.run(1, coroutine)
+        assert await scheduler.run(2, asyncio.sleep(0, 'other')) == 'other'  # Other keys are unaffected
+
+        release.set()
+        await asyncio.gather(running, *queued)
+        await scheduler.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+import asyncio
+
+from blackjack import BlackjackGame
+from engine import CasinoService
+from guard import BetGuard
+from poker import MultiHandPokerGame, VideoPokerGame
+from snapshots import (SNAPSHOT_VERSION, SnapshotBuilder, build_snapshot, dump_blackjack, dump_poker, load_blackjack,
+                       load_poker, read_snapshot, write_snapshot)
+
+
+def test_blackjack_round_trip_keeps_split_hands_and_insurance():
+    game = BlackjackGame(100)
+    game.deck.cards = [(rank, '♥️') for rank in reversed(('8', 'A', '8', '6', '3', '9'))]
+    game.start_game()
+    game.player_insures()
+    game.player_splits()
+
+    restored = load_blackjack(dump_blackjack(game))
+    assert [hand.cards for hand in restored.player_hands] == [hand.cards for hand in game.player_hands]
+    assert restored.hand_bets == game.hand_bets == [100, 100]
+    assert restored.dealer_hand.cards == game.dealer_hand.cards
+    assert restored.deck.cards == game.deck.cards
+    assert (restored.insurance_bet, restored.active_hand, restored.surrendered) == (50, 0, False)
+
+
+def test_poker_round_trip_keeps_held_cards_and_hand_count():
+    game = MultiHandPokerGame(10, 3)
+    game.start_game()
+    game.toggle_hold(1)
+    game.toggle_hold(4)
+
+    restored = load_poker(dump_poker(game))
+    assert isinstance(restored, MultiHandPokerGame)
+    assert restored.num_hands == 3
+    assert restored.hand == game.hand
+    assert restored.held_indices == [False, True, False, False, True]
+    assert restored.deck.cards == game.deck.cards
+
+
+def test_snapshot_file_round_trip(tmp_path):
+    poker_game = VideoPokerGame(20)
+    poker_game.start_game()
+    blackjack_game = BlackjackGame(30)
+    blackjack_game.start_game()
+    path = str(tmp_path / 'snapshot.pkl')
+
+    write_snapshot(build_snapshot({1: 500, 2: 700}, {1: blackjack_game}, {2: poker_game}), path)
+    balances, blackjack_games, poker_games = read_snapshot(path)
+    assert balances == {1: 500, 2: 700}
+    assert blackjack_games[1].player_hand.cards == blackjack_game.player_hand.cards
+    assert poker_games[2].hand == poker_game.hand
+
+
+def test_builder_matches_full_snapshot_after_changes():
+    casino = CasinoService(guard=BetGuard(daily_loss_limit=0))
+    builder = SnapshotBuilder()
+    casino.game_listeners.append(builder.mark_changed)
+
+    async def play():
+        for user_id in range(6):
+            casino.open_account(user_id)
+            await casino.place_bet(user_id, 'poker', 10)
+        builder.build(casino.balances, casino.blackjack_games, casino.poker_games)
+        await casino.act(0, 'poker', 'hold', index=2)  # Changed
+        await casino.act(1, 'poker', 'draw')           # Closed
+        await casino.place_bet(1, 'poker', 10)         # Reopened
+        await casino.act(2, 'poker', 'draw')           # Closed
+
+    asyncio.run(play())
+    incremental = builder.build(casino.balances, casino.blackjack_games, casino.poker_games)
+    full = build_snapshot(casino.balances, casino.blackjack_games, casino.poker_games)
+    assert incremental['poker'] == full['poker']
+    assert incremental['blackjack'] == full['blackjack']
+    assert incremental['balances'] == full['balances']
+    assert 2 not in incremental['poker']
+
+
+def test_builder_resyncs_games_it_was_never_told_about():
+    game = VideoPokerGame(10)
+    game.start_game()
+    snapshot = SnapshotBuilder().build({7: 100}, {}, {7: game})
+    assert snapshot['poker'] == {7: dump_poker(game)}
+
+
+def test_snapshots_in_another_format_are_ignored(tmp_path):
+    path = str(tmp_path / 'snapshot.pkl')
+    snapshot = build_snapshot({1: 500}, {}, {})
+    snapshot['version'] = SNAPSHOT_VERSION + 1
+    write_snapshot(snapshot, path)
+    assert read_snapshot(path) is None
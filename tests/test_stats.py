@@ -0,0 +1,26 @@
+import random
+
+from engine import STARTING_BALANCE, CasinoService
+from stats import Leaderboard
+
+
+def test_leaderboard_matches_a_sorted_ranking():
+    leaderboard, scores = Leaderboard(), {}
+    rng = random.Random(7)
+    for _ in range(5000):
+        user_id, score = rng.randrange(300), rng.randrange(-50, 50)
+        leaderboard.update(user_id, score)
+        scores[user_id] = score
+
+    expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    assert leaderboard.top(len(scores) + 10) == expected
+    assert leaderboard.top(5) == expected[:5]
+    assert len(leaderboard) == len(scores)
+
+
+def test_new_accounts_are_ranked_before_playing():
+    casino = CasinoService()
+    casino.open_account(1)
+    casino.open_account(2)
+    casino.settle(2, 'roulette', 50)
+    assert casino.stats.top(10) == [(2, STARTING_BALANCE + 50), (1, STARTING_BALANCE)]